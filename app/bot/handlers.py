@@ -1,4 +1,3 @@
-import json
 import logging
 from aiogram import Router, F
 from aiogram.filters import Command, CommandStart
@@ -8,9 +7,10 @@ from aiogram.types import Message
 
 from app.core.config import settings
 from app.db import repo
-from app.services import github, leetcode, streaks
-from app.services.timeutils import now_in_tz, parse_time_hhmm
-from app.services.scheduler import scheduler_instance
+from app.services import upstream
+from app.services.status import request_deadline, status_service
+from app.services.timeutils import parse_time_hhmm
+from app.services.scheduler import get_scheduler_instance
 
 log = logging.getLogger(__name__)
 
@@ -37,8 +37,9 @@ async def start_handler(message: Message) -> None:
             message.from_user.first_name,
             message.from_user.last_name,
         )
-    if scheduler_instance:
-        await scheduler_instance.schedule_for_user(message.from_user.id)
+    scheduler = get_scheduler_instance()
+    if scheduler:
+        await scheduler.schedule_for_user(message.from_user.id)
     note = ""
     if not settings.base_url.startswith("https://"):
         note = "\nWebApp dashboard requires HTTPS. Use ngrok or set BASE_URL to an https URL."
@@ -140,8 +141,9 @@ async def reminders_save_handler(message: Message, state: FSMContext) -> None:
         parts = [p.strip() for p in message.text.split(",") if p.strip()]
         reminders = [parse_time_hhmm(p) for p in parts]
         await repo.set_reminders(message.from_user.id, reminders)
-        if scheduler_instance:
-            await scheduler_instance.schedule_for_user(message.from_user.id)
+        scheduler = get_scheduler_instance()
+        if scheduler:
+            await scheduler.schedule_for_user(message.from_user.id)
         await state.clear()
         await message.answer("✅ Reminders updated")
     except Exception:
@@ -177,40 +179,33 @@ async def _send_status(message: Message) -> None:
             message.from_user.first_name,
             message.from_user.last_name,
         )
-    tz_name = user["tz"]
-    goals = json.loads(user["goals_json"])
-    repos = json.loads(user["repos_json"])
-    gh_user = user.get("github_username")
-    lc_user = user.get("leetcode_username")
-
-    github_commits = 0
-    leetcode_solved = 0
-    if gh_user:
-        github_commits = await github.count_commits_today(gh_user, tz_name, repos)
-    if lc_user:
-        leetcode_solved = await leetcode.count_accepted_today(lc_user, tz_name)
-
-    today = now_in_tz(tz_name).date()
-    await repo.upsert_daily_stats(
-        message.from_user.id,
-        today.isoformat(),
-        github_commits,
-        leetcode_solved,
-    )
-    streak_info = await streaks.update_streak_for_date(
-        message.from_user.id,
-        today,
-        goals,
-        {"github_commits": github_commits, "leetcode_solved": leetcode_solved},
-    )
-
+    status = await status_service.get(user, deadline=request_deadline())
+    goals = status["goals"]
+    stale = status["stale"]
+    gh_note = " (last known)" if "github" in stale else ""
+    lc_note = " (last known)" if "leetcode" in stale else ""
     text = (
-        f"📅 {today.isoformat()} ({tz_name})\n"
-        f"GitHub commits: {github_commits}/{goals['github_commits']}\n"
-        f"LeetCode solved: {leetcode_solved}/{goals['leetcode_solved']}\n"
-        f"Streak: {streak_info['current_streak']} (best {streak_info['best_streak']})"
+        f"📅 {status['date']} ({status['timezone']})\n"
+        f"GitHub commits: {status['github_commits']}/{goals['github_commits']}{gh_note}\n"
+        f"LeetCode solved: {status['leetcode_solved']}/{goals['leetcode_solved']}{lc_note}\n"
+        f"Streak: {status['streak']['current_streak']} (best {status['streak']['best_streak']})"
     )
+    warning = _unknown_handles_text(status["github_username"], status["leetcode_username"])
+    if warning:
+        text += "\n" + warning
     await message.answer(text)
+
+
+def _unknown_handles_text(gh_user: str | None, lc_user: str | None) -> str:
+    lines = []
+    for provider in upstream.bad_handles(gh_user, lc_user):
+        if provider == "github":
+            lines.append(f"⚠️ GitHub user {gh_user} was not found")
+        else:
+            lines.append(f"⚠️ LeetCode user {lc_user} was not found")
+    return "\n".join(lines)
+
+
 @router.message(Command("set"))
 async def set_handles(message: Message, state: FSMContext) -> None:
     user = await repo.get_user(message.from_user.id)
@@ -223,7 +218,12 @@ async def set_handles(message: Message, state: FSMContext) -> None:
             message.from_user.last_name,
         )
     await state.set_state(SettingsState.handles)
-    await message.answer("Send GitHub and LeetCode usernames as: github_username, leetcode_username")
+    text = "Send GitHub and LeetCode usernames as: github_username, leetcode_username"
+    if user:
+        warning = _unknown_handles_text(user.github_username, user.leetcode_username)
+        if warning:
+            text = warning + "\n" + text
+    await message.answer(text)
 
 
 @router.message(SettingsState.handles)
@@ -236,4 +236,8 @@ async def set_handles_save(message: Message, state: FSMContext) -> None:
     gh_user, lc_user = parts
     await repo.update_user_handles(message.from_user.id, gh_user, lc_user)
     await state.clear()
-    await message.answer(f"✅ Saved GitHub: {gh_user} | LeetCode: {lc_user}")
+    text = f"✅ Saved GitHub: {gh_user} | LeetCode: {lc_user}"
+    warning = _unknown_handles_text(gh_user, lc_user)
+    if warning:
+        text += "\n" + warning
+    await message.answer(text)
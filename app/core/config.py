@@ -10,11 +10,41 @@ class Settings:
     bot_token: str
     bot_username: str
     github_token: str | None
+    github_webhook_secret: str | None
+    github_api_url: str
+    leetcode_graphql_url: str
     base_url: str
     secret_key: str
     database_url: str | None
     database_path: str
     timezone_default: str
+    bot_mode: str
+    webhook_secret: str | None
+    webhook_path: str
+    leader_lease_seconds: int
+    reminder_sync_seconds: int
+    trace_sample_rate: float
+    trace_slow_ms: int
+    trace_buffer_size: int
+    debug_token: str | None
+    breaker_failure_threshold: int
+    breaker_reset_seconds: float
+    status_deadline_seconds: float
+    bad_handle_ttl_seconds: float
+    events_queue_size: int
+    json_encoder: str
+    sqlite_write_batch_ms: float
+    sqlite_write_batch_max: int
+    pg_pool_min_size: int
+    pg_pool_max_size: int
+    pg_statement_cache_size: int
+    pg_command_timeout: float
+    leaderboard_refresh_seconds: float
+    digest_hour: int
+    telegram_send_rate: float
+    cache_snapshot: bool
+    force_refresh_per_user: float
+    force_refresh_global: float
 
 
 _def_tz = "Europe/Kyiv"
@@ -24,9 +54,39 @@ settings = Settings(
     bot_token=os.getenv("BOT_TOKEN", "").strip(),
     bot_username=os.getenv("BOT_USERNAME", "").strip(),
     github_token=os.getenv("GITHUB_TOKEN", "").strip() or None,
+    github_webhook_secret=os.getenv("GITHUB_WEBHOOK_SECRET", "").strip() or None,
+    github_api_url=os.getenv("GITHUB_API_URL", "https://api.github.com").strip().rstrip("/"),
+    leetcode_graphql_url=os.getenv("LEETCODE_GRAPHQL_URL", "https://leetcode.com/graphql").strip(),
     base_url=os.getenv("BASE_URL", "").strip(),
     secret_key=os.getenv("SECRET_KEY", "").strip(),
     database_url=os.getenv("DATABASE_URL", "").strip() or None,
     database_path=os.getenv("DATABASE_PATH", "./codestreaker.db"),
     timezone_default=os.getenv("DEFAULT_TIMEZONE", _def_tz),
+    bot_mode=os.getenv("BOT_MODE", "polling").strip().lower() or "polling",
+    webhook_secret=os.getenv("WEBHOOK_SECRET", "").strip() or None,
+    webhook_path=os.getenv("WEBHOOK_PATH", "/telegram/webhook").strip() or "/telegram/webhook",
+    leader_lease_seconds=int(os.getenv("LEADER_LEASE_SECONDS", "30")),
+    reminder_sync_seconds=int(os.getenv("REMINDER_SYNC_SECONDS", "60")),
+    trace_sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.1")),
+    trace_slow_ms=int(os.getenv("TRACE_SLOW_MS", "2000")),
+    trace_buffer_size=int(os.getenv("TRACE_BUFFER_SIZE", "50")),
+    debug_token=os.getenv("DEBUG_TOKEN", "").strip() or None,
+    breaker_failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5")),
+    breaker_reset_seconds=float(os.getenv("BREAKER_RESET_SECONDS", "30")),
+    status_deadline_seconds=float(os.getenv("STATUS_DEADLINE_SECONDS", "3")),
+    bad_handle_ttl_seconds=float(os.getenv("BAD_HANDLE_TTL_SECONDS", "3600")),
+    events_queue_size=int(os.getenv("EVENTS_QUEUE_SIZE", "16")),
+    json_encoder=os.getenv("JSON_ENCODER", "auto").strip().lower(),
+    sqlite_write_batch_ms=float(os.getenv("SQLITE_WRITE_BATCH_MS", "2")),
+    sqlite_write_batch_max=int(os.getenv("SQLITE_WRITE_BATCH_MAX", "200")),
+    pg_pool_min_size=int(os.getenv("PG_POOL_MIN_SIZE", "2")),
+    pg_pool_max_size=int(os.getenv("PG_POOL_MAX_SIZE", "10")),
+    pg_statement_cache_size=int(os.getenv("PG_STATEMENT_CACHE_SIZE", "100")),
+    pg_command_timeout=float(os.getenv("PG_COMMAND_TIMEOUT", "10")),
+    leaderboard_refresh_seconds=float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "60")),
+    digest_hour=int(os.getenv("DIGEST_HOUR", "20")),
+    telegram_send_rate=float(os.getenv("TELEGRAM_SEND_RATE", "25")),
+    cache_snapshot=os.getenv("CACHE_SNAPSHOT", "on").strip().lower() not in {"0", "off", "false", "no"},
+    force_refresh_per_user=float(os.getenv("FORCE_REFRESH_PER_USER", "4")),
+    force_refresh_global=float(os.getenv("FORCE_REFRESH_GLOBAL", "5")),
 )
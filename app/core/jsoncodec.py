@@ -0,0 +1,39 @@
+import json
+import logging
+from typing import Any, Callable
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _load_orjson() -> Callable[[Any], bytes] | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=options)
+
+    return dumps
+
+
+def _select(name: str) -> tuple[str, Callable[[Any], bytes]]:
+    if name in ("auto", "orjson"):
+        fast = _load_orjson()
+        if fast is not None:
+            return "orjson", fast
+        if name == "orjson":
+            log.warning("JSON_ENCODER=orjson but orjson is not installed; using json")
+    elif name != "json":
+        log.warning("Unknown JSON_ENCODER %r; using json", name)
+    return "json", _stdlib_dumps
+
+
+encoder_name, dumps = _select(settings.json_encoder)
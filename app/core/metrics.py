@@ -0,0 +1,218 @@
+import math
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_REGISTRY: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        _REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = float(value)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = ([0] * len(self.buckets), [0.0])
+            self._series[key] = series
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        total[0] += value
+
+    def totals(self) -> dict[tuple[str, ...], tuple[int, float]]:
+        return {key: (sum(counts), total[0]) for key, (counts, total) in self._series.items()}
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in _REGISTRY) + "\n"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "codestreaker_http_request_duration_seconds",
+    "Web request latency by route template.",
+    ("method", "route", "status"),
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "codestreaker_upstream_request_duration_seconds",
+    "Latency of single GitHub/LeetCode HTTP calls.",
+    ("provider", "operation", "status"),
+)
+UPSTREAM_RETRIES = Counter(
+    "codestreaker_upstream_retries_total",
+    "Upstream calls retried after a failure.",
+    ("provider", "operation"),
+)
+UPSTREAM_ERRORS = Counter(
+    "codestreaker_upstream_errors_total",
+    "Failed upstream calls by error class.",
+    ("provider", "kind"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "codestreaker_db_query_duration_seconds",
+    "Latency of app.db.repo operations.",
+    ("query",),
+)
+CACHE_REQUESTS = Counter(
+    "codestreaker_cache_requests_total",
+    "In-process cache lookups by result.",
+    ("cache", "result"),
+)
+SCHEDULER_JOB_LAG_SECONDS = Histogram(
+    "codestreaker_scheduler_job_lag_seconds",
+    "Delay between a job's scheduled time and its submission.",
+    ("job",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+)
+SCHEDULER_JOBS_MISSED = Counter(
+    "codestreaker_scheduler_jobs_missed_total",
+    "Jobs skipped because they ran past their misfire grace time.",
+    ("job",),
+)
+CIRCUIT_STATE = Gauge(
+    "codestreaker_circuit_state",
+    "Upstream circuit breaker state: 0 closed, 1 half-open, 2 open.",
+    ("provider",),
+)
+CIRCUIT_REJECTED = Counter(
+    "codestreaker_circuit_rejected_total",
+    "Upstream calls failed fast because the circuit was open.",
+    ("provider",),
+)
+EVENT_SUBSCRIBERS = Gauge(
+    "codestreaker_event_subscribers",
+    "Open /api/events streams.",
+)
+EVENTS_DROPPED = Counter(
+    "codestreaker_events_dropped_total",
+    "Live updates dropped because a subscriber queue was full.",
+)
+SQLITE_WRITE_BATCH_SIZE = Histogram(
+    "codestreaker_sqlite_write_batch_size",
+    "Writes committed together by the SQLite group-commit writer.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+BOT_MESSAGES_SENT = Counter(
+    "codestreaker_bot_messages_sent_total",
+    "Bulk bot messages by outcome: sent, blocked (user left the bot) or failed.",
+    ("result",),
+)
+FORCE_REFRESHES = Counter(
+    "codestreaker_force_refreshes_total",
+    "Forced status refreshes: allowed, or served from cache by the per-user or global limit.",
+    ("result",),
+)
@@ -0,0 +1,108 @@
+import functools
+import json
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+_current_span: ContextVar["Span | None"] = ContextVar("codestreaker_span", default=None)
+_SLOW_TRACES: deque[dict[str, Any]] = deque(maxlen=max(settings.trace_buffer_size, 1))
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "end", "children")
+
+    def __init__(self, name: str, attrs: dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end: float | None = None
+        self.children: list[Span] = []
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self, origin: float | None = None) -> dict[str, Any]:
+        origin = self.start if origin is None else origin
+        data: dict[str, Any] = {
+            "name": self.name,
+            "offset_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in self.children]
+        return data
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name: str, **attrs: Any) -> Iterator[Span | None]:
+    """Open a root span for one unit of work, subject to TRACE_SAMPLE_RATE.
+
+    Sampled traces slower than TRACE_SLOW_MS are logged as a span tree and
+    kept in a bounded buffer for /debug/traces.
+    """
+    if settings.trace_sample_rate <= 0 or random.random() >= settings.trace_sample_rate:
+        yield None
+        return
+    root = Span(name, attrs)
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.end = time.perf_counter()
+        _current_span.reset(token)
+        if root.duration * 1000 >= settings.trace_slow_ms:
+            trace = root.to_dict()
+            trace["at"] = time.time()
+            _SLOW_TRACES.append(trace)
+            log.warning("Slow trace: %s", json.dumps(trace, default=str))
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span | None]:
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[_T]]], Callable[..., Awaitable[_T]]]:
+    def decorator(fn: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> _T:
+            with span(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def recent_slow_traces(limit: int | None = None) -> list[dict[str, Any]]:
+    traces = list(_SLOW_TRACES)
+    traces.reverse()
+    return traces[:limit] if limit else traces
@@ -4,6 +4,7 @@ CREATE TABLE IF NOT EXISTS users (
   github_username TEXT,
   leetcode_username TEXT,
   avatar TEXT,
+  github_webhook INTEGER NOT NULL DEFAULT 0,
   goals_json TEXT NOT NULL,
   reminders_json TEXT NOT NULL,
   repos_json TEXT NOT NULL,
@@ -0,0 +1,4 @@
+CREATE TABLE IF NOT EXISTS github_deliveries (
+  delivery_id TEXT PRIMARY KEY,
+  received_at TEXT NOT NULL
+);
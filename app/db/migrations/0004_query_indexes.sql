@@ -0,0 +1,5 @@
+CREATE INDEX IF NOT EXISTS idx_users_github_username_lower ON users (lower(github_username));
+
+CREATE INDEX IF NOT EXISTS idx_daily_stats_date ON daily_stats (date);
+
+CREATE INDEX IF NOT EXISTS idx_github_deliveries_received_at ON github_deliveries (received_at);
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS leaderboard (
+  board TEXT NOT NULL,
+  period TEXT NOT NULL,
+  telegram_id INTEGER NOT NULL,
+  score INTEGER NOT NULL,
+  PRIMARY KEY (board, period, telegram_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_leaderboard_rank ON leaderboard (board, period, score DESC, telegram_id);
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS weekly_digests (
+  telegram_id INTEGER NOT NULL,
+  week TEXT NOT NULL,
+  current_streak INTEGER NOT NULL,
+  sent_at TEXT NOT NULL,
+  PRIMARY KEY (telegram_id, week)
+);
@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS cache_snapshots (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL,
+  saved_at TEXT NOT NULL,
+  payload TEXT NOT NULL
+);
@@ -0,0 +1 @@
+ALTER TABLE users ADD COLUMN github_hook_secret TEXT;
@@ -1,19 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import functools
 import json
-from datetime import datetime
+import logging
+import secrets
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any
-
-import aiosqlite
-import asyncpg
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Iterable, Sequence, TypeVar
 
+from app.core import metrics, tracing
 from app.core.config import settings
+from app.db.writer import get_writer
+
+# Only one backend is used per process; each driver is imported on first use.
+if TYPE_CHECKING:
+    import aiosqlite
+    import asyncpg
+
+log = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
 
 DEFAULT_GOALS = {"github_commits": 2, "leetcode_solved": 2}
 DEFAULT_REMINDERS = ["10:00", "21:30"]
 DEFAULT_REPOS: list[str] = []
 DEFAULT_AVATAR = "🐶"
+# Columns added to users after the first deploys; backfilled once when a
+# database that predates schema_version is migrated.
+_USER_COLUMNS = {
+    "github_username": "TEXT",
+    "leetcode_username": "TEXT",
+    "avatar": "TEXT",
+    "github_webhook": "INTEGER NOT NULL DEFAULT 0",
+}
 _pg_pool: asyncpg.Pool | None = None
 
+_DELIVERY_RETENTION_DAYS = 3
+# Bulk upserts at or above this size use COPY instead of executemany.
+_COPY_MIN_ROWS = 500
+# Tables covered by export/import: column order and conflict key. The
+# INTEGER set lists columns that need converting back from CSV text.
+TABLES: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "users": (
+        (
+            "telegram_id",
+            "tz",
+            "github_username",
+            "leetcode_username",
+            "avatar",
+            "github_webhook",
+            "goals_json",
+            "reminders_json",
+            "repos_json",
+            "created_at",
+            "github_hook_secret",
+        ),
+        ("telegram_id",),
+    ),
+    "streaks": (("telegram_id", "current_streak", "best_streak", "last_success_date"), ("telegram_id",)),
+    "daily_stats": (("telegram_id", "date", "github_commits", "leetcode_solved"), ("telegram_id", "date")),
+}
+INTEGER_COLUMNS = {"telegram_id", "github_webhook", "current_streak", "best_streak", "github_commits", "leetcode_solved"}
+
+
+def _both(sql: str) -> tuple[str, str]:
+    """(Postgres, SQLite) text of a query written with ? placeholders.
+
+    Built once at import, so hot paths pick a finished string instead of
+    formatting placeholders on every call.
+    """
+    head, *rest = sql.split("?")
+    return head + "".join(f"${i}{part}" for i, part in enumerate(rest, 1)), sql
+
+
+def _sql(query: tuple[str, str]) -> str:
+    return query[0] if _is_postgres() else query[1]
+
+
+# Fixed queries as (Postgres, SQLite) pairs.
+_GET_USER = _both("SELECT * FROM users WHERE telegram_id = ?")
+_GET_USERS_BY_GITHUB = _both("SELECT * FROM users WHERE lower(github_username) = lower(?)")
+_GET_DAILY_STATS = _both("SELECT * FROM daily_stats WHERE telegram_id = ? AND date = ?")
+_GET_DAILY_STATS_RANGE = _both(
+    "SELECT * FROM daily_stats WHERE telegram_id = ? AND date BETWEEN ? AND ? ORDER BY date ASC"
+)
+_GET_STREAK_AND_HISTORY = _both(
+    "SELECT 'streak' AS kind, NULL AS date, current_streak, best_streak, last_success_date, "
+    "NULL AS github_commits, NULL AS leetcode_solved "
+    "FROM streaks WHERE telegram_id = ? "
+    "UNION ALL "
+    "SELECT 'day' AS kind, date, NULL, NULL, NULL, github_commits, leetcode_solved "
+    "FROM daily_stats WHERE telegram_id = ? AND date BETWEEN ? AND ?"
+)
+# save_day's upserts only write when a count changes, and then return the
+# stored counts; no row back means nothing changed. The _KEEP_GITHUB variant
+# is for webhook users: record_github_push increments github_commits
+# concurrently, so the status path must never write that column.
+_SAVE_DAY = _both(
+    "INSERT INTO daily_stats (telegram_id, date, github_commits, leetcode_solved) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(telegram_id, date) DO UPDATE SET github_commits = excluded.github_commits, "
+    "leetcode_solved = excluded.leetcode_solved "
+    "WHERE daily_stats.github_commits <> excluded.github_commits "
+    "OR daily_stats.leetcode_solved <> excluded.leetcode_solved "
+    "RETURNING github_commits, leetcode_solved"
+)
+_SAVE_DAY_KEEP_GITHUB = _both(
+    "INSERT INTO daily_stats (telegram_id, date, github_commits, leetcode_solved) VALUES (?, ?, 0, ?) "
+    "ON CONFLICT(telegram_id, date) DO UPDATE SET leetcode_solved = excluded.leetcode_solved "
+    "WHERE daily_stats.leetcode_solved <> excluded.leetcode_solved "
+    "RETURNING github_commits, leetcode_solved"
+)
+_GET_DAY_COUNTS = _both("SELECT github_commits, leetcode_solved FROM daily_stats WHERE telegram_id = ? AND date = ?")
+_UPSERT_STREAK = _both(
+    "INSERT INTO streaks (telegram_id, current_streak, best_streak, last_success_date) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(telegram_id) DO UPDATE SET current_streak = excluded.current_streak, "
+    "best_streak = excluded.best_streak, last_success_date = excluded.last_success_date"
+)
+_GET_GITHUB_HOOK_SECRET = _both("SELECT github_hook_secret FROM users WHERE telegram_id = ?")
+_SET_GITHUB_HOOK_SECRET = _both("UPDATE users SET github_hook_secret = ? WHERE telegram_id = ?")
+_CREATE_GITHUB_HOOK_SECRET = _both(
+    "UPDATE users SET github_hook_secret = ? WHERE telegram_id = ? AND github_hook_secret IS NULL"
+)
+_RELEASE_LEASE = _both("DELETE FROM leases WHERE name = ? AND holder = ?")
+_WRITE_SCORE = _both(
+    "INSERT INTO leaderboard (board, period, telegram_id, score) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(board, period, telegram_id) DO UPDATE SET score = excluded.score"
+)
+_GET_LEADERBOARD_SCORES = _both("SELECT telegram_id, score FROM leaderboard WHERE board = ? AND period = ?")
+_GET_RECENT_DAY_SCORES = _both(
+    "SELECT telegram_id, date, github_commits + leetcode_solved AS score FROM daily_stats WHERE date >= ?"
+)
+_WEEKLY_DIGEST = _both(
+    "SELECT u.telegram_id, "
+    "COALESCE(SUM(d.github_commits), 0) AS github_commits, "
+    "COALESCE(SUM(d.leetcode_solved), 0) AS leetcode_solved, "
+    "COALESCE(SUM(CASE WHEN d.github_commits + d.leetcode_solved > 0 THEN 1 ELSE 0 END), 0) AS active_days, "
+    "COALESCE(MAX(d.github_commits + d.leetcode_solved), 0) AS best_score, "
+    "(SELECT b.date FROM daily_stats b "
+    "WHERE b.telegram_id = u.telegram_id AND b.date BETWEEN ? AND ? "
+    "ORDER BY b.github_commits + b.leetcode_solved DESC, b.date LIMIT 1) AS best_day, "
+    "s.current_streak, s.best_streak, p.current_streak AS previous_streak "
+    "FROM users u "
+    "LEFT JOIN daily_stats d ON d.telegram_id = u.telegram_id AND d.date BETWEEN ? AND ? "
+    "LEFT JOIN streaks s ON s.telegram_id = u.telegram_id "
+    "LEFT JOIN weekly_digests p ON p.telegram_id = u.telegram_id AND p.week = ? "
+    "WHERE (u.github_username IS NOT NULL OR u.leetcode_username IS NOT NULL) "
+    "AND NOT EXISTS (SELECT 1 FROM weekly_digests c "
+    "WHERE c.telegram_id = u.telegram_id AND c.week = ?) "
+    "GROUP BY u.telegram_id, s.current_streak, s.best_streak, p.current_streak "
+    "ORDER BY u.telegram_id"
+)
+_RECORD_DIGEST = _both(
+    "INSERT INTO weekly_digests (telegram_id, week, current_streak, sent_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(telegram_id, week) DO NOTHING"
+)
+_SAVE_CACHE_SNAPSHOT = _both(
+    "INSERT INTO cache_snapshots (name, version, saved_at, payload) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET version = excluded.version, "
+    "saved_at = excluded.saved_at, payload = excluded.payload"
+)
+_PRUNE_CACHE_SNAPSHOTS = _both("DELETE FROM cache_snapshots WHERE saved_at < ?")
+_LOAD_CACHE_SNAPSHOTS = _both(
+    "SELECT name, version, saved_at, payload FROM cache_snapshots "
+    "WHERE saved_at >= ? ORDER BY saved_at DESC LIMIT ?"
+)
+
+_MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+_MIGRATION_LOCK_ID = 0x636F6465
+_SCHEMA_VERSION_SQL = (
+    "CREATE TABLE IF NOT EXISTS schema_version ("
+    "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL)"
+)
+_db_ready = False
+_init_lock = asyncio.Lock()
+
+_LEADERBOARD_VERSION = 5
+# Weekly boards older than this are not rebuilt; nothing reads them.
+_LEADERBOARD_REBUILD_WEEKS = 8
+# Called with (board, period, telegram_id, score) after leaderboard rows commit.
+score_listeners: list[Callable[[str, str, int, int], None]] = []
+
+# Per process and only invalidated by the replica that wrote, so keep it
+# short: it only needs to absorb the requests of one WebApp open.
+_USER_CACHE_TTL_SECONDS = 5
+_USER_CACHE: dict[int, tuple["UserRecord", float]] = {}
+
+
+class UserRecord:
+    __slots__ = (
+        "telegram_id",
+        "tz",
+        "github_username",
+        "leetcode_username",
+        "avatar",
+        "github_webhook",
+        "goals",
+        "reminders",
+        "repos",
+        "created_at",
+    )
+
+    def __init__(
+        self,
+        telegram_id: int,
+        tz: str,
+        github_username: str | None,
+        leetcode_username: str | None,
+        avatar: str | None,
+        github_webhook: bool,
+        goals: dict[str, int],
+        reminders: list[str],
+        repos: list[str],
+        created_at: str,
+    ) -> None:
+        self.telegram_id = telegram_id
+        self.tz = tz
+        self.github_username = github_username
+        self.leetcode_username = leetcode_username
+        self.avatar = avatar
+        self.github_webhook = github_webhook
+        self.goals = goals
+        self.reminders = reminders
+        self.repos = repos
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "UserRecord":
+        return cls(
+            telegram_id=int(row["telegram_id"]),
+            tz=row["tz"],
+            github_username=row.get("github_username"),
+            leetcode_username=row.get("leetcode_username"),
+            avatar=row.get("avatar"),
+            github_webhook=bool(row.get("github_webhook")),
+            goals=json.loads(row["goals_json"]),
+            reminders=json.loads(row["reminders_json"]),
+            repos=json.loads(row["repos_json"]),
+            created_at=row["created_at"],
+        )
+
+    def copy(self) -> "UserRecord":
+        return UserRecord(
+            telegram_id=self.telegram_id,
+            tz=self.tz,
+            github_username=self.github_username,
+            leetcode_username=self.leetcode_username,
+            avatar=self.avatar,
+            github_webhook=self.github_webhook,
+            goals=dict(self.goals),
+            reminders=list(self.reminders),
+            repos=list(self.repos),
+            created_at=self.created_at,
+        )
+
+    def __repr__(self) -> str:
+        return f"UserRecord(telegram_id={self.telegram_id!r}, tz={self.tz!r})"
+
+
+def _timed(fn: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> _T:
+        with metrics.DB_QUERY_SECONDS.time(query=name), tracing.span(f"db.{name}"):
+            return await fn(*args, **kwargs)
+
+    return wrapper
+
 
 def _is_postgres() -> bool:
     return bool(settings.database_url)
@@ -24,91 +280,214 @@ async def _ensure_pg_pool() -> asyncpg.Pool:
     if _pg_pool is None:
         if not settings.database_url:
             raise RuntimeError("DATABASE_URL is not set for Postgres connection")
-        _pg_pool = await asyncpg.create_pool(settings.database_url)
+        # asyncpg prepares every statement it runs and keeps it in a
+        # per-connection LRU keyed by the query text, so the hot queries
+        # below (fixed text) are parsed and planned once per connection.
+        import asyncpg
+
+        _pg_pool = await asyncpg.create_pool(
+            settings.database_url,
+            min_size=max(settings.pg_pool_min_size, 0),
+            max_size=max(settings.pg_pool_max_size, settings.pg_pool_min_size, 1),
+            statement_cache_size=max(settings.pg_statement_cache_size, 0),
+            command_timeout=settings.pg_command_timeout or None,
+        )
     return _pg_pool
 
 
-def _param(index: int) -> str:
-    return f"${index}" if _is_postgres() else "?"
+def _sqlite_connect() -> aiosqlite.Connection:
+    import aiosqlite
+
+    return aiosqlite.connect(settings.database_path)
+
 
+def _split_statements(sql: str) -> list[str]:
+    return [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
 
-async def _execute_schema_postgres(schema_sql: str) -> None:
+
+def _load_migrations() -> list[tuple[int, str, list[str]]]:
+    migrations = []
+    for path in sorted(_MIGRATIONS_DIR.glob("*.sql")):
+        version, _, name = path.stem.partition("_")
+        migrations.append((int(version), name, _split_statements(path.read_text(encoding="utf-8"))))
+    return migrations
+
+
+async def _migrate_postgres(migrations: list[tuple[int, str, list[str]]]) -> int:
     pool = await _ensure_pg_pool()
-    statements = [stmt.strip() for stmt in schema_sql.split(";") if stmt.strip()]
     async with pool.acquire() as conn:
-        for stmt in statements:
-            await conn.execute(stmt)
+        async with conn.transaction():
+            # Serialise replicas booting at the same time; released on commit.
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", _MIGRATION_LOCK_ID)
+            await conn.execute(_SCHEMA_VERSION_SQL)
+            current = await conn.fetchval("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            for version, name, statements in migrations:
+                if version <= current:
+                    continue
+                for stmt in statements:
+                    await conn.execute(stmt)
+                if current == 0 and version == 1:
+                    rows = await conn.fetch(
+                        "SELECT column_name FROM information_schema.columns WHERE table_name = 'users'"
+                    )
+                    columns = {row["column_name"] for row in rows}
+                    for col, col_type in _USER_COLUMNS.items():
+                        if col not in columns:
+                            await conn.execute(f"ALTER TABLE users ADD COLUMN {col} {col_type}")
+                await conn.execute(
+                    "INSERT INTO schema_version (version, name, applied_at) VALUES ($1, $2, $3)",
+                    version,
+                    name,
+                    datetime.utcnow().isoformat(),
+                )
+                log.info("Applied migration %04d_%s", version, name)
+            return current
 
 
-async def init_db() -> None:
-    schema_path = Path(__file__).with_name("schema.sql")
-    with schema_path.open("r", encoding="utf-8") as f:
-        schema_sql = f.read()
-    if _is_postgres():
-        await _execute_schema_postgres(schema_sql)
-        pool = await _ensure_pg_pool()
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT column_name FROM information_schema.columns WHERE table_name = 'users'"
-            )
-            columns = {row["column_name"] for row in rows}
-            for col in ("github_username", "leetcode_username", "avatar"):
-                if col not in columns:
-                    await conn.execute(f"ALTER TABLE users ADD COLUMN {col} TEXT")
-    else:
-        async with aiosqlite.connect(settings.database_path) as db:
-            await db.executescript(schema_sql)
-            cursor = await db.execute("PRAGMA table_info(users)")
-            columns = [row[1] for row in await cursor.fetchall()]
-            await cursor.close()
-            for col in ("github_username", "leetcode_username", "avatar"):
-                if col not in columns:
-                    await db.execute(f"ALTER TABLE users ADD COLUMN {col} TEXT")
+async def _migrate_sqlite(migrations: list[tuple[int, str, list[str]]]) -> int:
+    """Apply pending migrations; returns the version the database was at."""
+    async with _sqlite_connect() as db:
+        await db.execute(_SCHEMA_VERSION_SQL)
+        cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current = (await cursor.fetchone())[0]
+        await cursor.close()
+        if current >= migrations[-1][0]:
+            return current
+        await db.execute("BEGIN IMMEDIATE")
+        cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current = (await cursor.fetchone())[0]
+        await cursor.close()
+        try:
+            for version, name, statements in migrations:
+                if version <= current:
+                    continue
+                for stmt in statements:
+                    await db.execute(stmt)
+                if current == 0 and version == 1:
+                    cursor = await db.execute("PRAGMA table_info(users)")
+                    columns = [row[1] for row in await cursor.fetchall()]
+                    await cursor.close()
+                    for col, col_type in _USER_COLUMNS.items():
+                        if col not in columns:
+                            await db.execute(f"ALTER TABLE users ADD COLUMN {col} {col_type}")
+                await db.execute(
+                    "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, datetime.utcnow().isoformat()),
+                )
+                log.info("Applied migration %04d_%s", version, name)
             await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return current
 
 
-async def fetchone(sql: str, params: tuple[Any, ...] = ()) -> dict[str, Any] | None:
+async def init_db() -> None:
+    global _db_ready
+    if _db_ready:
+        return
+    async with _init_lock:
+        if _db_ready:
+            return
+        migrations = _load_migrations()
+        if _is_postgres():
+            previous = await _migrate_postgres(migrations)
+        else:
+            previous = await _migrate_sqlite(migrations)
+        if previous < _LEADERBOARD_VERSION:
+            await rebuild_leaderboard()
+        _db_ready = True
+
+
+async def _fetchone(sql: str, params: tuple[Any, ...] = ()) -> dict[str, Any] | None:
     if _is_postgres():
         pool = await _ensure_pg_pool()
         async with pool.acquire() as conn:
             row = await conn.fetchrow(sql, *params)
             return dict(row) if row else None
-    async with aiosqlite.connect(settings.database_path) as db:
-        db.row_factory = aiosqlite.Row
+    async with _sqlite_connect() as db:
+        db.row_factory = sqlite3.Row
         cursor = await db.execute(sql, params)
         row = await cursor.fetchone()
         await cursor.close()
         return dict(row) if row else None
 
 
-async def fetchall(sql: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+async def _fetchall(sql: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
     if _is_postgres():
         pool = await _ensure_pg_pool()
         async with pool.acquire() as conn:
             rows = await conn.fetch(sql, *params)
             return [dict(row) for row in rows]
-    async with aiosqlite.connect(settings.database_path) as db:
-        db.row_factory = aiosqlite.Row
+    async with _sqlite_connect() as db:
+        db.row_factory = sqlite3.Row
         cursor = await db.execute(sql, params)
         rows = await cursor.fetchall()
         await cursor.close()
         return [dict(row) for row in rows]
 
 
-async def get_user(telegram_id: int) -> dict[str, Any] | None:
-    return await fetchone(
-        f"SELECT * FROM users WHERE telegram_id = {_param(1)}",
-        (telegram_id,),
+@_timed
+async def fetchone(sql: str, params: tuple[Any, ...] = ()) -> dict[str, Any] | None:
+    return await _fetchone(sql, params)
+
+
+@_timed
+async def fetchall(sql: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+    return await _fetchall(sql, params)
+
+
+def _user_cache_get(telegram_id: int) -> UserRecord | None:
+    entry = _USER_CACHE.get(telegram_id)
+    if not entry:
+        return None
+    user, ts = entry
+    if time.monotonic() - ts > _USER_CACHE_TTL_SECONDS:
+        _USER_CACHE.pop(telegram_id, None)
+        return None
+    return user
+
+
+def invalidate_user(telegram_id: int) -> None:
+    _USER_CACHE.pop(telegram_id, None)
+
+
+async def get_user(telegram_id: int) -> UserRecord | None:
+    """The user's record. Each call gets its own copy, safe to modify."""
+    cached = _user_cache_get(telegram_id)
+    if cached is not None:
+        metrics.CACHE_REQUESTS.inc(cache="user", result="hit")
+        return cached.copy()
+    metrics.CACHE_REQUESTS.inc(cache="user", result="miss")
+    with metrics.DB_QUERY_SECONDS.time(query="get_user"), tracing.span("db.get_user"):
+        row = await _fetchone(
+            _sql(_GET_USER),
+            (telegram_id,),
+        )
+    if not row:
+        return None
+    user = UserRecord.from_row(row)
+    _USER_CACHE[telegram_id] = (user, time.monotonic())
+    return user.copy()
+
+
+@_timed
+async def get_users_by_github_username(github_username: str) -> list[UserRecord]:
+    rows = await _fetchall(
+        _sql(_GET_USERS_BY_GITHUB),
+        (github_username,),
     )
+    return [UserRecord.from_row(row) for row in rows]
 
 
+@_timed
 async def create_user_if_missing(
     telegram_id: int,
     tz: str,
     tg_username: str | None = None,
     first_name: str | None = None,
     last_name: str | None = None,
-) -> dict[str, Any]:
+) -> UserRecord:
     _ = (tg_username, first_name, last_name)
     now = datetime.utcnow().isoformat()
     goals = json.dumps(DEFAULT_GOALS)
@@ -138,7 +517,8 @@ async def create_user_if_missing(
                 telegram_id,
             )
     else:
-        async with aiosqlite.connect(settings.database_path) as db:
+
+        async def insert(db: aiosqlite.Connection) -> None:
             await db.execute(
                 "INSERT OR IGNORE INTO users (telegram_id, tz, github_username, leetcode_username, avatar, goals_json, reminders_json, repos_json, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 (
@@ -157,29 +537,33 @@ async def create_user_if_missing(
                 "INSERT OR IGNORE INTO streaks (telegram_id, current_streak, best_streak, last_success_date) VALUES (?, 0, 0, NULL)",
                 (telegram_id,),
             )
-            await db.commit()
+
+        await get_writer().submit(insert)
     user = await get_user(telegram_id)
     assert user
     return user
 
 
+@functools.lru_cache(maxsize=64)
+def _update_user_sql(keys: tuple[str, ...]) -> tuple[str, str]:
+    set_clause = ", ".join(f"{key} = ?" for key in keys)
+    return _both(f"UPDATE users SET {set_clause} WHERE telegram_id = ?")
+
+
+@_timed
 async def update_user_fields(telegram_id: int, **fields: Any) -> None:
     if not fields:
         return
-    keys = list(fields.keys())
-    set_clause = ", ".join(f"{k} = {_param(i + 1)}" for i, k in enumerate(keys))
+    sql = _sql(_update_user_sql(tuple(fields)))
     values = list(fields.values())
     values.append(telegram_id)
-    where_param = _param(len(values))
-    sql = f"UPDATE users SET {set_clause} WHERE telegram_id = {where_param}"
     if _is_postgres():
         pool = await _ensure_pg_pool()
         async with pool.acquire() as conn:
             await conn.execute(sql, *values)
     else:
-        async with aiosqlite.connect(settings.database_path) as db:
-            await db.execute(sql, values)
-            await db.commit()
+        await get_writer().execute(sql, tuple(values))
+    invalidate_user(telegram_id)
 
 
 async def set_github_username(telegram_id: int, username: str) -> None:
@@ -214,75 +598,504 @@ async def set_repos(telegram_id: int, repos: list[str]) -> None:
     await update_user_fields(telegram_id, repos_json=json.dumps(repos))
 
 
+@_timed
+async def get_github_hook_secret(telegram_id: int) -> str | None:
+    row = await _fetchone(_sql(_GET_GITHUB_HOOK_SECRET), (telegram_id,))
+    return row["github_hook_secret"] if row else None
+
+
+async def create_github_hook_secret(telegram_id: int, rotate: bool = False) -> str | None:
+    """The secret signing the user's own push webhook; None if the user doesn't exist.
+
+    Created on first call. rotate replaces an existing one, so deliveries
+    signed with the old secret are rejected from then on.
+    """
+    sql = _sql(_SET_GITHUB_HOOK_SECRET if rotate else _CREATE_GITHUB_HOOK_SECRET)
+    values = (secrets.token_hex(32), telegram_id)
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(sql, *values)
+    else:
+        await get_writer().execute(sql, values)
+    return await get_github_hook_secret(telegram_id)
+
+
+@_timed
 async def get_daily_stats(telegram_id: int, date: str) -> dict[str, Any] | None:
-    return await fetchone(
-        f"SELECT * FROM daily_stats WHERE telegram_id = {_param(1)} AND date = {_param(2)}",
+    return await _fetchone(
+        _sql(_GET_DAILY_STATS),
         (telegram_id, date),
     )
 
 
+@_timed
 async def get_daily_stats_range(
     telegram_id: int,
     start_date: str,
     end_date: str,
 ) -> list[dict[str, Any]]:
-    return await fetchall(
-        f"SELECT * FROM daily_stats WHERE telegram_id = {_param(1)} AND date BETWEEN {_param(2)} AND {_param(3)} ORDER BY date ASC",
+    return await _fetchall(
+        _sql(_GET_DAILY_STATS_RANGE),
         (telegram_id, start_date, end_date),
     )
 
 
-async def upsert_daily_stats(
+@_timed
+async def get_streak_and_history(
+    telegram_id: int,
+    start_date: str,
+    end_date: str,
+) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
+    """Streak row and daily_stats in [start_date, end_date] in one round trip."""
+    rows = await _fetchall(
+        _sql(_GET_STREAK_AND_HISTORY),
+        (telegram_id, telegram_id, start_date, end_date),
+    )
+    streak = None
+    days = []
+    for row in rows:
+        kind = row.pop("kind")
+        if kind == "streak":
+            streak = {
+                "current_streak": row["current_streak"],
+                "best_streak": row["best_streak"],
+                "last_success_date": row["last_success_date"],
+            }
+        else:
+            days.append(
+                {
+                    "telegram_id": telegram_id,
+                    "date": row["date"],
+                    "github_commits": row["github_commits"],
+                    "leetcode_solved": row["leetcode_solved"],
+                }
+            )
+    days.sort(key=lambda day: day["date"])
+    return streak, days
+
+
+@_timed
+async def save_day(
     telegram_id: int,
     date: str,
-    github_commits: int,
+    github_commits: int | None,
     leetcode_solved: int,
-) -> None:
+    streak: dict[str, Any] | None = None,
+) -> tuple[int, int]:
+    """Write the day's numbers and, if given, the new streak in one transaction.
+
+    github_commits=None leaves the stored count alone (webhook users).
+    Returns the (github_commits, leetcode_solved) now stored. The day's
+    leaderboard scores are only recomputed when a count actually changed,
+    so the common unchanged refresh costs two primary-key lookups.
+    """
+    if github_commits is None:
+        day_sql = _sql(_SAVE_DAY_KEEP_GITHUB)
+        day_values: tuple[Any, ...] = (telegram_id, date, leetcode_solved)
+    else:
+        day_sql = _sql(_SAVE_DAY)
+        day_values = (telegram_id, date, github_commits, leetcode_solved)
+    counts_sql = _sql(_GET_DAY_COUNTS)
+    streak_values = None
+    scores: list[tuple[str, str, int, int]] = []
+    if streak is not None:
+        streak_values = (telegram_id, streak["current_streak"], streak["best_streak"], streak["last_success_date"])
+        scores.append(("streak", "", telegram_id, int(streak["current_streak"])))
+    streak_sql = _sql(_UPSERT_STREAK)
     if _is_postgres():
         pool = await _ensure_pg_pool()
         async with pool.acquire() as conn:
-            await conn.execute(
-                "INSERT INTO daily_stats (telegram_id, date, github_commits, leetcode_solved) VALUES ($1, $2, $3, $4) "
-                "ON CONFLICT(telegram_id, date) DO UPDATE SET github_commits = EXCLUDED.github_commits, leetcode_solved = EXCLUDED.leetcode_solved",
-                telegram_id,
-                date,
-                github_commits,
-                leetcode_solved,
-            )
+            async with conn.transaction():
+                row = await conn.fetchrow(day_sql, *day_values)
+                changed = row is not None
+                if not changed:
+                    row = await conn.fetchrow(counts_sql, telegram_id, date)
+                stored = tuple(row)
+                if streak_values is not None:
+                    await conn.execute(streak_sql, *streak_values)
+                    await _write_scores(conn, scores)
+                if changed:
+                    scores += await _refresh_daily_scores(conn, [(telegram_id, date)])
     else:
-        async with aiosqlite.connect(settings.database_path) as db:
-            await db.execute(
-                "INSERT INTO daily_stats (telegram_id, date, github_commits, leetcode_solved) VALUES (?, ?, ?, ?) "
-                "ON CONFLICT(telegram_id, date) DO UPDATE SET github_commits = excluded.github_commits, leetcode_solved = excluded.leetcode_solved",
-                (telegram_id, date, github_commits, leetcode_solved),
+
+        async def op(db: aiosqlite.Connection) -> tuple[tuple[Any, ...], list[tuple[str, str, int, int]]]:
+            cursor = await db.execute(day_sql, day_values)
+            row = await cursor.fetchone()
+            await cursor.close()
+            changed = row is not None
+            if not changed:
+                cursor = await db.execute(counts_sql, (telegram_id, date))
+                row = await cursor.fetchone()
+                await cursor.close()
+            if streak_values is not None:
+                await db.execute(streak_sql, streak_values)
+                await _write_scores(db, scores)
+            return tuple(row), await _refresh_daily_scores(db, [(telegram_id, date)]) if changed else []
+
+        stored, day_scores = await get_writer().submit(op)
+        scores += day_scores
+    _notify_scores(scores)
+    return int(stored[0]), int(stored[1])
+
+
+@_timed
+async def record_github_push(
+    delivery_id: str,
+    increments: list[tuple[int, str, int]],
+) -> bool:
+    """Apply webhook commit increments once per delivery id.
+
+    Returns False when the delivery was already recorded.
+    """
+    now = datetime.utcnow()
+    received_at = now.isoformat()
+    prune_before = (now - timedelta(days=_DELIVERY_RETENTION_DAYS)).isoformat()
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                inserted = await conn.fetchval(
+                    "INSERT INTO github_deliveries (delivery_id, received_at) VALUES ($1, $2) "
+                    "ON CONFLICT (delivery_id) DO NOTHING RETURNING delivery_id",
+                    delivery_id,
+                    received_at,
+                )
+                if inserted is None:
+                    return False
+                scores = []
+                if increments:
+                    await conn.executemany(
+                        "INSERT INTO daily_stats (telegram_id, date, github_commits, leetcode_solved) VALUES ($1, $2, $3, 0) "
+                        "ON CONFLICT(telegram_id, date) DO UPDATE SET github_commits = daily_stats.github_commits + EXCLUDED.github_commits",
+                        increments,
+                    )
+                    scores = await _refresh_daily_scores(conn, [(telegram_id, day) for telegram_id, day, _ in increments])
+                await conn.execute(
+                    "DELETE FROM github_deliveries WHERE received_at < $1",
+                    prune_before,
+                )
+        _notify_scores(scores)
+        return True
+
+    async def apply(db: aiosqlite.Connection) -> list[tuple[str, str, int, int]] | None:
+        cursor = await db.execute(
+            "INSERT OR IGNORE INTO github_deliveries (delivery_id, received_at) VALUES (?, ?)",
+            (delivery_id, received_at),
+        )
+        inserted = cursor.rowcount
+        await cursor.close()
+        if not inserted:
+            return None
+        await db.executemany(
+            "INSERT INTO daily_stats (telegram_id, date, github_commits, leetcode_solved) VALUES (?, ?, ?, 0) "
+            "ON CONFLICT(telegram_id, date) DO UPDATE SET github_commits = daily_stats.github_commits + excluded.github_commits",
+            increments,
+        )
+        await db.execute(
+            "DELETE FROM github_deliveries WHERE received_at < ?",
+            (prune_before,),
+        )
+        return await _refresh_daily_scores(db, [(telegram_id, day) for telegram_id, day, _ in increments])
+
+    scores = await get_writer().submit(apply)
+    if scores is None:
+        return False
+    _notify_scores(scores)
+    return True
+
+
+@_timed
+async def try_acquire_lease(name: str, holder: str, ttl_seconds: float) -> bool:
+    now_ms = int(time.time() * 1000)
+    expires_ms = now_ms + int(ttl_seconds * 1000)
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            acquired = await conn.fetchval(
+                "INSERT INTO leases (name, holder, expires_at) VALUES ($1, $2, $3) "
+                "ON CONFLICT (name) DO UPDATE SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at "
+                "WHERE leases.holder = EXCLUDED.holder OR leases.expires_at < $4 "
+                "RETURNING holder",
+                name,
+                holder,
+                expires_ms,
+                now_ms,
             )
-            await db.commit()
+            return acquired is not None
+    rowcount = await get_writer().execute(
+        "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+        "ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+        "WHERE leases.holder = excluded.holder OR leases.expires_at < ?",
+        (name, holder, expires_ms, now_ms),
+    )
+    return rowcount > 0
+
+
+@_timed
+async def release_lease(name: str, holder: str) -> None:
+    sql = _sql(_RELEASE_LEASE)
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(sql, name, holder)
+    else:
+        await get_writer().execute(sql, (name, holder))
 
 
-async def get_streaks(telegram_id: int) -> dict[str, Any] | None:
-    return await fetchone(
-        f"SELECT * FROM streaks WHERE telegram_id = {_param(1)}",
-        (telegram_id,),
+@functools.lru_cache(maxsize=None)
+def _upsert_sql(table: str) -> tuple[str, str]:
+    columns, key = TABLES[table]
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col not in key)
+    return _both(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT({', '.join(key)}) DO UPDATE SET {updates}"
     )
 
 
-async def update_streaks(
-    telegram_id: int,
-    current_streak: int,
-    best_streak: int,
-    last_success_date: str | None,
-) -> None:
-    sql = (
-        "UPDATE streaks SET current_streak = "
-        f"{_param(1)}, best_streak = {_param(2)}, last_success_date = {_param(3)} "
-        f"WHERE telegram_id = {_param(4)}"
+async def _pg_copy_upsert(conn: asyncpg.Connection, table: str, values: list[tuple[Any, ...]]) -> None:
+    # Must run inside a transaction: the staging table is dropped on commit.
+    columns, key = TABLES[table]
+    staging = f"{table}_load"
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in columns if col not in key)
+    await conn.execute(f"CREATE TEMP TABLE {staging} (LIKE {table}) ON COMMIT DROP")
+    await conn.copy_records_to_table(staging, records=values, columns=columns)
+    await conn.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {staging} "
+        f"ON CONFLICT({', '.join(key)}) DO UPDATE SET {updates}"
     )
-    values = (current_streak, best_streak, last_success_date, telegram_id)
+
+
+async def iter_rows(table: str, batch_size: int = 500) -> AsyncIterator[dict[str, Any]]:
+    """Stream a whole table in key order without loading it into memory.
+
+    Postgres reads through a server-side cursor; SQLite steps its cursor
+    batch_size rows at a time.
+    """
+    columns, key = TABLES[table]
+    sql = f"SELECT {', '.join(columns)} FROM {table} ORDER BY {', '.join(key)}"
+    async for row in _stream(sql, (), batch_size):
+        yield row
+
+
+async def _stream(sql: str, params: tuple[Any, ...], batch_size: int) -> AsyncIterator[dict[str, Any]]:
     if _is_postgres():
         pool = await _ensure_pg_pool()
         async with pool.acquire() as conn:
-            await conn.execute(sql, *values)
+            async with conn.transaction():
+                async for record in conn.cursor(sql, *params, prefetch=batch_size):
+                    yield dict(record)
+        return
+    async with _sqlite_connect() as db:
+        db.row_factory = sqlite3.Row
+        async with db.execute(sql, params) as cursor:
+            while rows := await cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield dict(row)
+
+
+@_timed
+async def upsert_rows(table: str, rows: list[tuple[Any, ...]]) -> None:
+    """Insert or overwrite rows given in TABLES column order.
+
+    Idempotent: replaying the same rows leaves the table unchanged. The
+    leaderboard is not maintained here; call rebuild_leaderboard() after
+    importing daily_stats or streaks.
+    """
+    if not rows:
+        return
+    sql = _sql(_upsert_sql(table))
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                if len(rows) >= _COPY_MIN_ROWS:
+                    columns, key = TABLES[table]
+                    positions = [columns.index(col) for col in key]
+                    merged = {tuple(row[i] for i in positions): row for row in rows}
+                    await _pg_copy_upsert(conn, table, list(merged.values()))
+                else:
+                    await conn.executemany(sql, rows)
     else:
-        async with aiosqlite.connect(settings.database_path) as db:
-            await db.execute(sql, values)
-            await db.commit()
+
+        async def op(db: aiosqlite.Connection) -> None:
+            await db.executemany(sql, rows)
+
+        await get_writer().submit(op)
+    if table == "users":
+        _USER_CACHE.clear()
+
+
+def week_start(day: str) -> str:
+    """Monday of the ISO week containing day, the period key of weekly boards."""
+    parsed = date.fromisoformat(day)
+    return (parsed - timedelta(days=parsed.weekday())).isoformat()
+
+
+async def _fetch_tuples(conn: Any, sql: str, params: Sequence[Any]) -> list[tuple[Any, ...]]:
+    if _is_postgres():
+        return [tuple(row) for row in await conn.fetch(sql, *params)]
+    cursor = await conn.execute(sql, params)
+    rows = await cursor.fetchall()
+    await cursor.close()
+    return [tuple(row) for row in rows]
+
+
+async def _write_scores(conn: Any, scores: list[tuple[str, str, int, int]]) -> None:
+    # Same executemany signature on asyncpg and aiosqlite connections.
+    if scores:
+        await conn.executemany(_sql(_WRITE_SCORE), scores)
+
+
+@functools.lru_cache(maxsize=64)
+def _score_sums_sql(users: int) -> tuple[tuple[str, str], tuple[str, str]]:
+    # Keyed on the IN-list length: nearly every call refreshes one user.
+    marks = ", ".join("?" for _ in range(users))
+    totals = _both(
+        "SELECT telegram_id, SUM(github_commits + leetcode_solved) FROM daily_stats "
+        f"WHERE telegram_id IN ({marks}) GROUP BY telegram_id"
+    )
+    weeks = _both(
+        "SELECT telegram_id, SUM(github_commits + leetcode_solved) FROM daily_stats "
+        f"WHERE date BETWEEN ? AND ? AND telegram_id IN ({marks}) GROUP BY telegram_id"
+    )
+    return totals, weeks
+
+
+async def _refresh_daily_scores(conn: Any, keys: Iterable[tuple[int, str]]) -> list[tuple[str, str, int, int]]:
+    """Recompute the all-time and weekly scores of the (telegram_id, date) keys just written.
+
+    Runs in the writer's transaction, so scores never lag the rows they sum.
+    Only the touched users are read, through the primary key and date index.
+    """
+    keys = list(keys)
+    users = sorted({telegram_id for telegram_id, _ in keys})
+    weeks = sorted({week_start(day) for _, day in keys})
+    scores: list[tuple[str, str, int, int]] = []
+    for offset in range(0, len(users), 500):
+        chunk = users[offset : offset + 500]
+        totals_sql, weeks_sql = _score_sums_sql(len(chunk))
+        rows = await _fetch_tuples(conn, _sql(totals_sql), chunk)
+        scores += [("all", "", telegram_id, int(total)) for telegram_id, total in rows]
+        for week in weeks:
+            week_end = (date.fromisoformat(week) + timedelta(days=6)).isoformat()
+            rows = await _fetch_tuples(conn, _sql(weeks_sql), (week, week_end, *chunk))
+            scores += [("week", week, telegram_id, int(total)) for telegram_id, total in rows]
+    await _write_scores(conn, scores)
+    return scores
+
+
+def _notify_scores(scores: list[tuple[str, str, int, int]]) -> None:
+    for listener in score_listeners:
+        for board, period, telegram_id, score in scores:
+            listener(board, period, telegram_id, score)
+
+
+@_timed
+async def get_leaderboard_scores(board: str, period: str) -> list[tuple[int, int]]:
+    rows = await _fetchall(
+        _sql(_GET_LEADERBOARD_SCORES),
+        (board, period),
+    )
+    return [(int(row["telegram_id"]), int(row["score"])) for row in rows]
+
+
+async def rebuild_leaderboard() -> int:
+    """Recompute the leaderboard table from daily_stats and streaks.
+
+    Runs when the table is first created and after bulk imports. Weekly
+    boards are rebuilt for the last _LEADERBOARD_REBUILD_WEEKS weeks only.
+    Returns the number of rows written.
+    """
+    since = week_start((datetime.utcnow().date() - timedelta(weeks=_LEADERBOARD_REBUILD_WEEKS)).isoformat())
+    scores: list[tuple[str, str, int, int]] = []
+    totals = await _fetchall(
+        "SELECT telegram_id, SUM(github_commits + leetcode_solved) AS score FROM daily_stats GROUP BY telegram_id"
+    )
+    scores += [("all", "", int(row["telegram_id"]), int(row["score"])) for row in totals]
+    streaks = await _fetchall("SELECT telegram_id, current_streak FROM streaks")
+    scores += [("streak", "", int(row["telegram_id"]), int(row["current_streak"])) for row in streaks]
+    weekly: dict[tuple[str, int], int] = {}
+    recent = await _fetchall(
+        _sql(_GET_RECENT_DAY_SCORES),
+        (since,),
+    )
+    for row in recent:
+        key = (week_start(row["date"]), int(row["telegram_id"]))
+        weekly[key] = weekly.get(key, 0) + int(row["score"])
+    scores += [("week", week, telegram_id, score) for (week, telegram_id), score in weekly.items()]
+
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("DELETE FROM leaderboard")
+                await _write_scores(conn, scores)
+    else:
+
+        async def op(db: aiosqlite.Connection) -> None:
+            await db.execute("DELETE FROM leaderboard")
+            await _write_scores(db, scores)
+
+        await get_writer().submit(op)
+    _notify_scores(scores)
+    log.info("Rebuilt leaderboard: %d rows", len(scores))
+    return len(scores)
+
+
+async def iter_weekly_digest(week: str, previous_week: str, batch_size: int = 500) -> AsyncIterator[dict[str, Any]]:
+    """Week totals, best day and streaks of every configured user, in one grouped query.
+
+    week and previous_week are Monday dates. Users already recorded in
+    weekly_digests for week are left out, so a rerun only picks up the rest.
+    previous_streak is the streak sent in last week's digest, if any.
+    """
+    week_end = (date.fromisoformat(week) + timedelta(days=6)).isoformat()
+    sql = _sql(_WEEKLY_DIGEST)
+    async for row in _stream(sql, (week, week_end, week, week_end, previous_week, week), batch_size):
+        yield row
+
+
+@_timed
+async def record_digests(week: str, rows: list[tuple[int, int]]) -> None:
+    """Mark (telegram_id, current_streak) pairs as sent for week."""
+    if not rows:
+        return
+    sent_at = datetime.utcnow().isoformat()
+    sql = _sql(_RECORD_DIGEST)
+    values = [(telegram_id, week, streak, sent_at) for telegram_id, streak in rows]
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            await conn.executemany(sql, values)
+        return
+
+    async def op(db: aiosqlite.Connection) -> None:
+        await db.executemany(sql, values)
+
+    await get_writer().submit(op)
+
+
+async def save_cache_snapshot(name: str, version: int, payload: str, prune_before: str) -> None:
+    """Write name's snapshot and drop every snapshot saved before prune_before."""
+    params = (name, version, datetime.utcnow().isoformat(), payload)
+    if _is_postgres():
+        pool = await _ensure_pg_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(_sql(_SAVE_CACHE_SNAPSHOT), *params)
+                await conn.execute(_sql(_PRUNE_CACHE_SNAPSHOTS), prune_before)
+        return
+
+    async def op(db: aiosqlite.Connection) -> None:
+        await db.execute(_sql(_SAVE_CACHE_SNAPSHOT), params)
+        await db.execute(_sql(_PRUNE_CACHE_SNAPSHOTS), (prune_before,))
+
+    await get_writer().submit(op)
+
+
+async def load_cache_snapshots(since: str, limit: int) -> list[dict[str, Any]]:
+    """Snapshots saved at or after since, newest first."""
+    return await _fetchall(_sql(_LOAD_CACHE_SNAPSHOTS), (since, limit))
+
@@ -0,0 +1,151 @@
+"""Group-commit writer for the SQLite backend.
+
+Every write is queued to one task that owns a single connection. Whatever
+arrives within SQLITE_WRITE_BATCH_MS of the first queued write is applied
+in one transaction, so concurrent writers share a lock acquisition and an
+fsync instead of queueing on the database lock. Each write runs under its
+own savepoint: a failing write raises in its caller only and the rest of
+the batch still commits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from app.core import metrics
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+log = logging.getLogger(__name__)
+
+WriteOp = Callable[["aiosqlite.Connection"], Awaitable[Any]]
+
+
+class SQLiteWriter:
+    def __init__(self, path: str, batch_ms: float, batch_max: int) -> None:
+        self.path = path
+        self.batch_delay = max(batch_ms, 0) / 1000
+        self.batch_max = max(batch_max, 1)
+        self._queue: asyncio.Queue[tuple[WriteOp, asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def submit(self, op: WriteOp) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((op, future))
+        return await future
+
+    async def execute(self, sql: str, params: tuple[Any, ...] = ()) -> int:
+        """Queue one statement; returns its rowcount once committed."""
+
+        async def op(db: aiosqlite.Connection) -> int:
+            cursor = await db.execute(sql, params)
+            rowcount = cursor.rowcount
+            await cursor.close()
+            return rowcount
+
+        return await self.submit(op)
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._fail_pending(RuntimeError("SQLite writer closed"))
+
+    def _fail_pending(self, exc: Exception) -> None:
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(exc)
+
+    async def _collect(self) -> list[tuple[WriteOp, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_delay
+        while len(batch) < self.batch_max:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        import aiosqlite
+
+        try:
+            async with aiosqlite.connect(self.path, isolation_level=None) as db:
+                while True:
+                    batch = await self._collect()
+                    await self._apply(db, batch)
+        except Exception as exc:
+            # The next submit() starts a fresh task; don't leave callers waiting.
+            log.exception("SQLite writer stopped")
+            self._fail_pending(exc)
+
+    async def _apply(self, db: aiosqlite.Connection, batch: list[tuple[WriteOp, asyncio.Future]]) -> None:
+        metrics.SQLITE_WRITE_BATCH_SIZE.observe(len(batch))
+        results: list[tuple[asyncio.Future, Any, BaseException | None]] = []
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            for op, future in batch:
+                await db.execute("SAVEPOINT op")
+                try:
+                    result = await op(db)
+                except Exception as exc:
+                    await db.execute("ROLLBACK TO op")
+                    results.append((future, None, exc))
+                else:
+                    results.append((future, result, None))
+                await db.execute("RELEASE op")
+            await db.execute("COMMIT")
+        except BaseException as exc:
+            log.warning("SQLite write batch of %d failed: %s", len(batch), exc)
+            if db.in_transaction:
+                await db.execute("ROLLBACK")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc if isinstance(exc, Exception) else RuntimeError("writer stopped"))
+            if not isinstance(exc, Exception):
+                raise
+            return
+        for future, result, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+_writer: SQLiteWriter | None = None
+
+
+def get_writer() -> SQLiteWriter:
+    global _writer
+    if _writer is None:
+        _writer = SQLiteWriter(settings.database_path, settings.sqlite_write_batch_ms, settings.sqlite_write_batch_max)
+    return _writer
+
+
+async def close_writer() -> None:
+    if _writer is not None:
+        await _writer.close()
@@ -1,30 +1,108 @@
+from __future__ import annotations
+
+import time
+
+# Taken before anything else is imported; the first profile step starts here.
+_STARTED = time.perf_counter()
+
+import argparse
 import asyncio
+import contextlib
+import importlib
 import logging
-import uvicorn
-from aiogram import Bot, Dispatcher
+from typing import TYPE_CHECKING
 
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.db import repo
-from app.bot.router import router
-from app.services.scheduler import ReminderScheduler, set_scheduler_instance
-from app.web.server import app as web_app
+
+# Drivers, the bot stack and the web stack are imported inside main(), once
+# settings are validated, so --profile-startup can time each of them.
+if TYPE_CHECKING:
+    import uvicorn
+    from aiogram import Bot, Dispatcher
 
 log = logging.getLogger(__name__)
 
+# Set by run_web(); its .started tells shutdown whether this process served.
+_web_server: uvicorn.Server | None = None
+
+
+class StartupProfile:
+    """Wall time of each startup step, logged by --profile-startup."""
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.steps: list[tuple[str, float]] = []
+        self._last = _STARTED
+
+    def step(self, name: str) -> None:
+        now = time.perf_counter()
+        self.steps.append((name, now - self._last))
+        self._last = now
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        width = max(len(name) for name, _ in self.steps)
+        lines = [f"  {name:<{width}}  {seconds * 1000:8.1f} ms" for name, seconds in self.steps]
+        lines.append(f"  {'total':<{width}}  {(self._last - _STARTED) * 1000:8.1f} ms")
+        log.info("Startup profile (%s mode):\n%s", settings.bot_mode, "\n".join(lines))
+
 
 async def run_bot(bot: Bot, dp: Dispatcher) -> None:
-    await dp.start_polling(bot)
+    # uvicorn owns SIGINT/SIGTERM: a second loop.add_signal_handler would
+    # replace its handler, and only one of the two would ever stop.
+    await dp.start_polling(bot, handle_signals=False)
+
+
+async def run_polling(bot: Bot, dp: Dispatcher) -> None:
+    """Poll Telegram next to the web server until either of them stops.
+
+    A signal stops uvicorn; polling is then stopped too, so main() always
+    gets to its shutdown steps.
+    """
+    web = asyncio.create_task(run_web())
+    polling = asyncio.create_task(run_bot(bot, dp))
+    try:
+        await asyncio.wait({web, polling}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if _web_server is not None:
+            _web_server.should_exit = True
+        try:
+            await dp.stop_polling()
+        except RuntimeError:
+            # Not started yet, or already finished.
+            polling.cancel()
+        for result in await asyncio.gather(web, polling, return_exceptions=True):
+            if isinstance(result, Exception):
+                raise result
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    from app.web.server import set_bot_dispatcher
+
+    set_bot_dispatcher(bot, dp)
+    webhook_url = settings.base_url.rstrip("/") + settings.webhook_path
+    await bot.set_webhook(webhook_url, secret_token=settings.webhook_secret)
+    log.info("Telegram webhook set: %s", webhook_url)
+    await run_web()
 
 
 async def run_web() -> None:
+    global _web_server
+    import uvicorn
+
+    from app.web.server import app as web_app
+
     config = uvicorn.Config(web_app, host="0.0.0.0", port=8000, log_level="info")
-    server = uvicorn.Server(config)
-    await server.serve()
+    _web_server = uvicorn.Server(config)
+    await _web_server.serve()
 
 
-async def main() -> None:
+async def main(profile_startup: bool = False) -> None:
     setup_logging()
+    profile = StartupProfile(profile_startup)
+    profile.step("interpreter, config")
 
     if not settings.bot_token:
         raise RuntimeError("BOT_TOKEN is not set")
@@ -32,8 +110,40 @@ async def main() -> None:
         raise RuntimeError("BASE_URL is not set")
     if not settings.secret_key:
         raise RuntimeError("SECRET_KEY is not set")
+    if settings.bot_mode not in {"polling", "webhook"}:
+        raise RuntimeError(f"Unknown BOT_MODE: {settings.bot_mode}")
+    if settings.bot_mode == "webhook" and not settings.webhook_secret:
+        raise RuntimeError("WEBHOOK_SECRET is not set")
 
+    from app.db import repo
+    from app.db.writer import close_writer
+
+    profile.step("import db")
     await repo.init_db()
+    profile.step("init db")
+
+    from app.services import snapshot
+
+    if settings.cache_snapshot:
+        try:
+            await snapshot.restore()
+        except Exception:
+            log.exception("Cache snapshot restore failed")
+    profile.step("import services, restore caches")
+
+    from aiogram import Bot, Dispatcher
+
+    from app.bot.router import router
+    from app.services.leader import LeaderElector
+    from app.services.scheduler import ReminderScheduler, set_scheduler_instance
+
+    profile.step("import bot, scheduler")
+    # Loaded only so their import time shows in the profile; run_web() is
+    # what uses them.
+    importlib.import_module("uvicorn")
+    importlib.import_module("app.web.server")
+
+    profile.step("import web, uvicorn")
 
     bot = Bot(token=settings.bot_token)
     dp = Dispatcher()
@@ -42,13 +152,49 @@ async def main() -> None:
     scheduler = ReminderScheduler(bot)
     set_scheduler_instance(scheduler)
     scheduler.start()
-    await scheduler.schedule_all_users()
+    elector = LeaderElector(
+        "scheduler",
+        settings.leader_lease_seconds,
+        on_elected=scheduler.activate,
+        on_demoted=scheduler.deactivate,
+    )
+    profile.step("init bot, scheduler")
+    profile.report()
+
+    elector_task = asyncio.create_task(elector.run())
+    try:
+        if settings.bot_mode == "webhook":
+            await run_webhook(bot, dp)
+        else:
+            await bot.delete_webhook()
+            await run_polling(bot, dp)
+    finally:
+        elector_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await elector_task
+        # A process that never got to serve has nothing worth keeping; saving
+        # would replace this replica's last good snapshot with empty caches.
+        if settings.cache_snapshot and _web_server is not None and _web_server.started:
+            try:
+                await snapshot.save()
+            except Exception:
+                log.exception("Cache snapshot save failed")
+        await close_writer()
+
 
-    await asyncio.gather(run_bot(bot, dp), run_web())
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the CodeStreaker bot and web app.")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="log how long each import and init step took before serving",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(main(profile_startup=args.profile_startup))
     except KeyboardInterrupt:
         pass
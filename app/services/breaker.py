@@ -0,0 +1,80 @@
+import logging
+import time
+
+from app.core import metrics
+from app.core.config import settings
+from app.services import upstream
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one upstream provider.
+
+    After failure_threshold failures in a row the breaker opens and calls
+    fail fast for reset_seconds. Then a single probe is let through
+    (half-open): success closes the breaker, failure reopens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started = 0.0
+        metrics.CIRCUIT_STATE.set(_STATE_VALUES[CLOSED], provider=name)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            log.warning("Circuit %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        metrics.CIRCUIT_STATE.set(_STATE_VALUES[state], provider=self.name)
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.reset_seconds:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN and now - self._probe_started >= self.reset_seconds:
+            # No probe running, or the last one never reported back.
+            self._probe_started = now
+            return True
+        metrics.CIRCUIT_REJECTED.inc(provider=self.name)
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_started = 0.0
+        if self.state != CLOSED:
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_started = 0.0
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def record(self, exc: BaseException) -> None:
+        if is_provider_failure(exc):
+            self.record_failure()
+        else:
+            # The provider answered; the request itself was bad.
+            self.record_success()
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    return upstream.classify(exc) in (upstream.RATE_LIMITED, upstream.TRANSIENT)
+
+
+github_breaker = CircuitBreaker("github", settings.breaker_failure_threshold, settings.breaker_reset_seconds)
+leetcode_breaker = CircuitBreaker("leetcode", settings.breaker_failure_threshold, settings.breaker_reset_seconds)
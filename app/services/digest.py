@@ -0,0 +1,84 @@
+"""Sunday-evening weekly summary sent to every configured user."""
+
+import logging
+import time
+from datetime import date, timedelta
+from typing import Any
+
+from aiogram import Bot
+
+from app.services.sender import FAILED, RateLimitedSender
+from app.core.config import settings
+from app.db import repo
+from app.services.timeutils import now_in_tz
+
+log = logging.getLogger(__name__)
+
+# Sent and recorded in chunks so an interrupted run resumes where it stopped.
+_RECORD_CHUNK = 200
+
+
+def _plural(count: int, word: str) -> str:
+    return f"{count} {word}{'s' if count != 1 else ''}"
+
+
+def render_digest(row: dict[str, Any], week: str) -> str:
+    start = date.fromisoformat(week)
+    end = start + timedelta(days=6)
+    lines = [
+        f"📊 Your week, {start:%b %d} – {end:%b %d}",
+        f"GitHub: {_plural(int(row['github_commits']), 'commit')}",
+        f"LeetCode: {_plural(int(row['leetcode_solved']), 'solve')}",
+        f"Active days: {int(row['active_days'])}/7",
+    ]
+    if row["best_day"] and int(row["best_score"]) > 0:
+        lines.append(f"Best day: {date.fromisoformat(row['best_day']):%A} ({int(row['best_score'])})")
+    streak = int(row["current_streak"] or 0)
+    previous = row["previous_streak"]
+    if previous is None:
+        lines.append(f"🔥 Streak: {streak}")
+    elif streak == int(previous):
+        lines.append(f"🔥 Streak: {streak} (unchanged)")
+    else:
+        lines.append(f"🔥 Streak: {streak} ({streak - int(previous):+d} since last week)")
+    return "\n".join(lines)
+
+
+async def run_weekly_digest(bot: Bot, today: date | None = None) -> dict[str, int]:
+    """Render every user's digest from one query and send them rate-limited.
+
+    Returns counts per send result. Users already sent this week's digest
+    are skipped, so the job is safe to rerun.
+    """
+    started = time.perf_counter()
+    today = today or now_in_tz(settings.timezone_default).date()
+    week = repo.week_start(today.isoformat())
+    previous_week = (date.fromisoformat(week) - timedelta(weeks=1)).isoformat()
+    # Rendered text is small; collecting it keeps the read cursor from
+    # staying open for the whole send budget.
+    messages = [
+        (int(row["telegram_id"]), render_digest(row, week), int(row["current_streak"] or 0))
+        async for row in repo.iter_weekly_digest(week, previous_week)
+    ]
+    queried = time.perf_counter()
+
+    sender = RateLimitedSender(bot, settings.telegram_send_rate)
+    counts: dict[str, int] = {}
+    for offset in range(0, len(messages), _RECORD_CHUNK):
+        chunk = messages[offset : offset + _RECORD_CHUNK]
+        results = await sender.send_many((telegram_id, text) for telegram_id, text, _ in chunk)
+        for result in results.values():
+            counts[result] = counts.get(result, 0) + 1
+        # Blocked chats are recorded too; only failures are retried on a rerun.
+        await repo.record_digests(
+            week, [(telegram_id, streak) for telegram_id, _, streak in chunk if results.get(telegram_id) != FAILED]
+        )
+    log.info(
+        "Weekly digest %s: %d users, query %.2fs, total %.2fs, %s",
+        week,
+        len(messages),
+        queried - started,
+        time.perf_counter() - started,
+        counts,
+    )
+    return counts
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from typing import Any
+
+from app.core import metrics
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_SUBSCRIBERS: dict[int, set[asyncio.Queue]] = {}
+
+
+def subscribe(telegram_id: int) -> asyncio.Queue:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(settings.events_queue_size, 1))
+    _SUBSCRIBERS.setdefault(telegram_id, set()).add(queue)
+    metrics.EVENT_SUBSCRIBERS.set(sum(len(queues) for queues in _SUBSCRIBERS.values()))
+    return queue
+
+
+def unsubscribe(telegram_id: int, queue: asyncio.Queue) -> None:
+    queues = _SUBSCRIBERS.get(telegram_id)
+    if queues is not None:
+        queues.discard(queue)
+        if not queues:
+            _SUBSCRIBERS.pop(telegram_id, None)
+    metrics.EVENT_SUBSCRIBERS.set(sum(len(queues) for queues in _SUBSCRIBERS.values()))
+
+
+def has_subscribers(telegram_id: int) -> bool:
+    return telegram_id in _SUBSCRIBERS
+
+
+def publish(telegram_id: int, event: dict[str, Any]) -> None:
+    """Fan an update out to every open stream of the user.
+
+    Queues are bounded; a subscriber that falls behind loses its oldest
+    update, since each event carries absolute values.
+    """
+    for queue in _SUBSCRIBERS.get(telegram_id, ()):
+        if queue.full():
+            queue.get_nowait()
+            metrics.EVENTS_DROPPED.inc()
+        queue.put_nowait(event)
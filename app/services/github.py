@@ -1,15 +1,28 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from typing import Iterable
 
 import httpx
 
+from app.core import metrics, tracing
 from app.core.config import settings
+from app.services import upstream
+from app.services.breaker import CLOSED, github_breaker
 
 log = logging.getLogger(__name__)
 
+# Last events feed per user with its ETag. GitHub answers a conditional
+# request for an unchanged feed with 304, which is not rate limited. Only
+# the PushEvent fields tally_push_events reads are kept.
+_EVENTS_CACHE: dict[str, tuple[str, list[dict], float]] = {}
+_EVENTS_VALIDATOR_TTL_SECONDS = 86400
+# Compare results are immutable for a (repo, before, head) triple.
+_COMPARE_CACHE: dict[tuple[str, str, str], int] = {}
+_COMPARE_CACHE_MAX = 4096
+
 
 def _headers() -> dict:
     headers = {"Accept": "application/vnd.github+json", "User-Agent": "CodeStreaker"}
@@ -18,19 +31,111 @@ def _headers() -> dict:
     return headers
 
 
-async def _request_events(username: str) -> list[dict]:
-    url = f"https://api.github.com/users/{username}/events"
+async def _request_events(username: str) -> list[dict] | None:
+    """Fetch the public events feed; None when GitHub could not be reached."""
+    if upstream.is_bad_handle("github", username):
+        return []
+    url = f"{settings.github_api_url}/users/{username}/events"
     async with httpx.AsyncClient(timeout=15) as client:
         for attempt in range(3):
-            try:
-                resp = await client.get(url, headers=_headers())
-                resp.raise_for_status()
-                data = resp.json()
-                return data if isinstance(data, list) else []
-            except Exception as exc:
-                log.warning("GitHub API error: %s", exc)
+            if not github_breaker.allow():
+                break
+            if attempt:
+                metrics.UPSTREAM_RETRIES.inc(provider="github", operation="events")
+            start = time.perf_counter()
+            status = "error"
+            kind = upstream.TRANSIENT
+            cached = _EVENTS_CACHE.get(username.lower())
+            headers = _headers()
+            if cached:
+                headers["If-None-Match"] = cached[0]
+            with tracing.span("github.events", attempt=attempt) as sp:
+                try:
+                    resp = await client.get(url, headers=headers)
+                    status = str(resp.status_code)
+                    if resp.status_code == 304 and cached:
+                        github_breaker.record_success()
+                        metrics.CACHE_REQUESTS.inc(cache="github_events", result="hit")
+                        _EVENTS_CACHE[username.lower()] = (cached[0], cached[1], time.time())
+                        return cached[1]
+                    resp.raise_for_status()
+                    data = resp.json()
+                    github_breaker.record_success()
+                    if not isinstance(data, list):
+                        return []
+                    etag = resp.headers.get("ETag")
+                    if etag:
+                        _EVENTS_CACHE[username.lower()] = (etag, _compact_push_events(data), time.time())
+                    return data
+                except Exception as exc:
+                    kind = upstream.record_error("github", exc)
+                    log.warning("GitHub API error (%s): %s", kind, exc)
+                    github_breaker.record(exc)
+                finally:
+                    if sp:
+                        sp.attrs["status"] = status
+                    metrics.UPSTREAM_REQUEST_SECONDS.observe(
+                        time.perf_counter() - start,
+                        provider="github",
+                        operation="events",
+                        status=status,
+                    )
+            if kind == upstream.NOT_FOUND:
+                upstream.mark_bad_handle("github", username)
+                return []
+            # Only transient errors can go away on their own within a few seconds.
+            if kind != upstream.TRANSIENT or attempt == 2 or github_breaker.state != CLOSED:
+                break
+            with tracing.span("github.retry_sleep", seconds=1 + attempt):
                 await asyncio.sleep(1 + attempt)
-    return []
+    return None
+
+
+def _compact_push_events(events: list[dict]) -> list[dict]:
+    compact = []
+    for event in events:
+        if event.get("type") != "PushEvent":
+            continue
+        payload = event.get("payload") or {}
+        commits = payload.get("commits")
+        compact.append(
+            {
+                "type": "PushEvent",
+                "created_at": event.get("created_at", ""),
+                "repo": {"name": (event.get("repo") or {}).get("name", "")},
+                "payload": {
+                    "commits": [{"sha": c.get("sha")} for c in commits] if isinstance(commits, list) else [],
+                    "distinct_size": payload.get("distinct_size"),
+                    "size": payload.get("size"),
+                    "before": payload.get("before"),
+                    "head": payload.get("head"),
+                },
+            }
+        )
+    return compact
+
+
+def snapshot_caches() -> dict:
+    return {
+        "events": [[user, etag, events, ts] for user, (etag, events, ts) in _EVENTS_CACHE.items()],
+        "compare": [[*key, value] for key, value in _COMPARE_CACHE.items()],
+    }
+
+
+def restore_caches(data: dict) -> int:
+    """Load snapshot_caches() output, skipping validators unused for a day."""
+    now = time.time()
+    restored = 0
+    for user, etag, events, ts in data.get("events", []):
+        if now - ts < _EVENTS_VALIDATOR_TTL_SECONDS:
+            _EVENTS_CACHE.setdefault(user, (etag, events, ts))
+            restored += 1
+    for repo_full, before, head, value in data.get("compare", [])[-_COMPARE_CACHE_MAX:]:
+        if len(_COMPARE_CACHE) >= _COMPARE_CACHE_MAX:
+            break
+        _COMPARE_CACHE.setdefault((repo_full, before, head), int(value))
+        restored += 1
+    return restored
 
 
 def _event_in_local_day(created_at: str, start_utc: datetime, end_utc: datetime) -> bool:
@@ -63,47 +168,78 @@ async def _count_commits_via_compare(repo_full: str, before: str, head: str) ->
     """
     if not repo_full or "/" not in repo_full or not before or not head:
         return 0
+    cached = _COMPARE_CACHE.get((repo_full, before, head))
+    if cached is not None:
+        metrics.CACHE_REQUESTS.inc(cache="github_compare", result="hit")
+        return cached
+    metrics.CACHE_REQUESTS.inc(cache="github_compare", result="miss")
+    if not github_breaker.allow():
+        raise RuntimeError("GitHub circuit open")
 
     owner, repo = repo_full.split("/", 1)
-    url = f"https://api.github.com/repos/{owner}/{repo}/compare/{before}...{head}"
+    url = f"{settings.github_api_url}/repos/{owner}/{repo}/compare/{before}...{head}"
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(url, headers=_headers())
-        resp.raise_for_status()
-        data = resp.json()
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with tracing.span("github.compare", repo=repo_full):
+            async with httpx.AsyncClient(timeout=15) as client:
+                resp = await client.get(url, headers=_headers())
+                status = str(resp.status_code)
+                resp.raise_for_status()
+                data = resp.json()
+        github_breaker.record_success()
+    except Exception as exc:
+        upstream.record_error("github", exc)
+        github_breaker.record(exc)
+        raise
+    finally:
+        metrics.UPSTREAM_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            provider="github",
+            operation="compare",
+            status=status,
+        )
 
     # GitHub compare response usually has 'ahead_by' and 'commits' list
     ahead_by = _to_int(data.get("ahead_by"), 0)
-    if ahead_by > 0:
-        return ahead_by
-
     commits = data.get("commits")
-    if isinstance(commits, list):
-        return len(commits)
-
-    return 0
-
-
-async def count_commits_today(username: str, tz_name: str, repos: list[str]) -> int:
-    events = await _request_events(username)
-
+    if ahead_by > 0:
+        count = ahead_by
+    elif isinstance(commits, list):
+        count = len(commits)
+    else:
+        count = 0
+    if len(_COMPARE_CACHE) >= _COMPARE_CACHE_MAX:
+        _COMPARE_CACHE.pop(next(iter(_COMPARE_CACHE)))
+    _COMPARE_CACHE[(repo_full, before, head)] = count
+    return count
+
+
+def _local_day_bounds(tz_name: str) -> tuple[date, datetime, datetime]:
     tz = ZoneInfo(tz_name)
     today_local = datetime.now(tz).date()
     start_local = datetime.combine(today_local, datetime.min.time(), tzinfo=tz)
     end_local = start_local + timedelta(days=1)
+    return today_local, start_local.astimezone(timezone.utc), end_local.astimezone(timezone.utc)
+
 
-    start_utc = start_local.astimezone(timezone.utc)
-    end_utc = end_local.astimezone(timezone.utc)
+def tally_push_events(
+    events: list[dict],
+    start_utc: datetime,
+    end_utc: datetime,
+    repos: Iterable[str],
+) -> tuple[int, list[tuple[str, str, str]], dict[str, int]]:
+    """Sum commits of PushEvents inside [start_utc, end_utc).
 
+    Events that carry no commit count are returned as (repo, before, head)
+    for the compare fallback instead of being counted.
+    """
     repo_set = set(r.strip() for r in repos if r and r.strip())
 
     total = 0
-    push_events_today = 0
-
-    methods_list = 0
-    methods_distinct = 0
-    methods_size = 0
-    methods_compare = 0
+    needs_compare: list[tuple[str, str, str]] = []
+    methods = {"list": 0, "distinct_size": 0, "size": 0, "compare": 0}
 
     for event in events:
         if event.get("type") != "PushEvent":
@@ -121,35 +257,54 @@ async def count_commits_today(username: str, tz_name: str, repos: list[str]) ->
         commits_list = payload.get("commits") or []
         if isinstance(commits_list, list) and len(commits_list) > 0:
             c = len(commits_list)
-            methods_list += 1
+            methods["list"] += 1
         else:
-            distinct = payload.get("distinct_size")
-            distinct_int = _to_int(distinct, 0)
-
+            distinct_int = _to_int(payload.get("distinct_size"), 0)
             if distinct_int > 0:
                 c = distinct_int
-                methods_distinct += 1
+                methods["distinct_size"] += 1
             else:
-                size_val = payload.get("size")
-                size_int = _to_int(size_val, 0)
+                size_int = _to_int(payload.get("size"), 0)
                 if size_int > 0:
                     c = size_int
-                    methods_size += 1
+                    methods["size"] += 1
                 else:
-                    # ✅ NEW: compare fallback using before/head
-                    before = payload.get("before") or ""
-                    head = payload.get("head") or ""
-                    try:
-                        c = await _count_commits_via_compare(repo, before, head)
-                    except Exception as exc:
-                        log.warning("GitHub compare API error: %s", exc)
-                        c = 0
-                    methods_compare += 1
+                    needs_compare.append((repo, payload.get("before") or "", payload.get("head") or ""))
+                    methods["compare"] += 1
+                    continue
 
         total += c
-        push_events_today += 1
         log.info("GitHub push event commits: %d", c)
 
+    return total, needs_compare, methods
+
+
+@tracing.traced("github.count_commits_today")
+async def count_commits_today(username: str, tz_name: str, repos: list[str]) -> int | None:
+    """Today's commit count, or None when it could not be determined."""
+    events = await _request_events(username)
+    if events is None:
+        return None
+    today_local, start_utc, end_utc = _local_day_bounds(tz_name)
+    total, needs_compare, methods = tally_push_events(events, start_utc, end_utc, repos)
+
+    if needs_compare:
+        # Compare fallbacks are independent, so resolve them concurrently.
+        results = await asyncio.gather(
+            *(_count_commits_via_compare(*args) for args in needs_compare),
+            return_exceptions=True,
+        )
+        for c in results:
+            if isinstance(c, BaseException):
+                log.warning("GitHub compare API error: %s", c)
+                if upstream.classify(c) in (upstream.RATE_LIMITED, upstream.TRANSIENT):
+                    # A partial sum would under-count, so report the day as unknown.
+                    return None
+                # The push can't be resolved (e.g. repo gone); count it as empty.
+                c = 0
+            total += c
+            log.info("GitHub push event commits: %d", c)
+
     log.info(
         "GitHub commits today: kyiv_date=%s start_utc=%s end_utc=%s events=%d push_events_today=%d commits=%d "
         "methods=list:%d distinct_size:%d size:%d compare:%d",
@@ -157,11 +312,11 @@ async def count_commits_today(username: str, tz_name: str, repos: list[str]) ->
         start_utc.isoformat(),
         end_utc.isoformat(),
         len(events),
-        push_events_today,
+        sum(methods.values()),
         total,
-        methods_list,
-        methods_distinct,
-        methods_size,
-        methods_compare,
+        methods["list"],
+        methods["distinct_size"],
+        methods["size"],
+        methods["compare"],
     )
     return total
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable
+
+from app.db import repo
+
+log = logging.getLogger(__name__)
+
+
+class LeaderElector:
+    """Holds a renewable lease row so that only one replica runs background jobs.
+
+    The lease is renewed every ttl/3 seconds. A replica that cannot renew
+    steps down immediately, and a crashed leader is replaced once its lease
+    expires, so failover takes at most ttl + ttl/3 seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: int,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+    ) -> None:
+        self.name = name
+        self.ttl_seconds = max(int(ttl_seconds), 3)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+
+    async def _set_leader(self, is_leader: bool) -> None:
+        if is_leader == self.is_leader:
+            return
+        if is_leader:
+            log.info("Leader elected: lease=%s holder=%s", self.name, self.holder)
+            try:
+                await self._on_elected()
+            except Exception:
+                # Holding the lease without running the jobs would block every
+                # other replica. Undo, hand the lease back and let the next
+                # round (here or on another replica) try again.
+                await self._abandon_lease()
+                raise
+            self.is_leader = True
+        else:
+            log.info("Leader demoted: lease=%s holder=%s", self.name, self.holder)
+            self.is_leader = False
+            await self._on_demoted()
+
+    async def _abandon_lease(self) -> None:
+        try:
+            await self._on_demoted()
+        except Exception as exc:
+            log.warning("Cleanup after failed activation failed: %s", exc)
+        try:
+            await repo.release_lease(self.name, self.holder)
+        except Exception as exc:
+            log.warning("Leader lease release failed: %s", exc)
+
+    async def run(self) -> None:
+        interval = self.ttl_seconds / 3
+        try:
+            while True:
+                try:
+                    acquired = await repo.try_acquire_lease(self.name, self.holder, self.ttl_seconds)
+                except Exception as exc:
+                    log.warning("Leader lease renewal failed: %s", exc)
+                    acquired = False
+                try:
+                    await self._set_leader(acquired)
+                except Exception:
+                    log.exception("Leader transition failed: lease=%s", self.name)
+                await asyncio.sleep(interval)
+        finally:
+            if self.is_leader:
+                self.is_leader = False
+                await self._on_demoted()
+                try:
+                    await repo.release_lease(self.name, self.holder)
+                except Exception as exc:
+                    log.warning("Leader lease release failed: %s", exc)
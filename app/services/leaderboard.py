@@ -0,0 +1,96 @@
+"""Ranked views over the leaderboard table.
+
+Each (board, period) is held in memory as a SortedList of (-score,
+telegram_id), so a rank is one bisect and a score change is O(log n).
+Writes on this process update the lists through repo.score_listeners.
+Lists are reloaded from the indexed table every LEADERBOARD_REFRESH_SECONDS
+to pick up writes made by other replicas.
+"""
+
+import time
+from datetime import date, timedelta
+
+from sortedcontainers import SortedList
+
+from app.core.config import settings
+from app.db import repo
+
+BOARDS = ("week", "all", "streak")
+
+
+class SortedBoard:
+    __slots__ = ("_keys", "_scores", "loaded_at")
+
+    def __init__(self, rows: list[tuple[int, int]]) -> None:
+        self._scores = dict(rows)
+        self._keys = SortedList((-score, telegram_id) for telegram_id, score in self._scores.items())
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def set(self, telegram_id: int, score: int) -> None:
+        old = self._scores.get(telegram_id)
+        if old == score:
+            return
+        if old is not None:
+            self._keys.remove((-old, telegram_id))
+        self._keys.add((-score, telegram_id))
+        self._scores[telegram_id] = score
+
+    def score(self, telegram_id: int) -> int | None:
+        return self._scores.get(telegram_id)
+
+    def _rank_of(self, score: int) -> int:
+        # (-score,) sorts before every (-score, id): counts strictly higher
+        # scores, so ties share a rank.
+        return self._keys.bisect_left((-score,)) + 1
+
+    def rank(self, telegram_id: int) -> int | None:
+        score = self._scores.get(telegram_id)
+        return None if score is None else self._rank_of(score)
+
+    def page(self, offset: int, limit: int) -> list[tuple[int, int, int]]:
+        """(rank, telegram_id, score) for positions offset..offset+limit."""
+        return [
+            (self._rank_of(-neg_score), telegram_id, -neg_score)
+            for neg_score, telegram_id in self._keys.islice(offset, offset + limit)
+        ]
+
+
+_BOARDS: dict[tuple[str, str], SortedBoard] = {}
+
+
+def period_for(board: str, today: date) -> str:
+    return repo.week_start(today.isoformat()) if board == "week" else ""
+
+
+def _on_score(board: str, period: str, telegram_id: int, score: int) -> None:
+    ranking = _BOARDS.get((board, period))
+    if ranking is not None:
+        ranking.set(telegram_id, score)
+
+
+repo.score_listeners.append(_on_score)
+
+
+def _prune_weeks(current: str) -> None:
+    oldest = (date.fromisoformat(current) - timedelta(weeks=1)).isoformat()
+    for key in [key for key in _BOARDS if key[0] == "week" and key[1] < oldest]:
+        del _BOARDS[key]
+
+
+async def get_board(board: str, period: str) -> SortedBoard:
+    key = (board, period)
+    ranking = _BOARDS.get(key)
+    if ranking is None or time.monotonic() - ranking.loaded_at > settings.leaderboard_refresh_seconds:
+        ranking = SortedBoard(await repo.get_leaderboard_scores(board, period))
+        _BOARDS[key] = ranking
+        if board == "week":
+            _prune_weeks(period)
+    return ranking
+
+
+async def standing(board: str, period: str, telegram_id: int) -> dict[str, int | None]:
+    ranking = await get_board(board, period)
+    return {"rank": ranking.rank(telegram_id), "score": ranking.score(telegram_id), "total": len(ranking)}
@@ -1,12 +1,20 @@
 import asyncio
 import logging
+import time
 from datetime import timezone, datetime
 from zoneinfo import ZoneInfo
 import httpx
 
+from app.core import metrics, tracing
+from app.core.config import settings
+from app.services import upstream
+from app.services.breaker import CLOSED, leetcode_breaker
+
 log = logging.getLogger(__name__)
 
-LEETCODE_GRAPHQL = "https://leetcode.com/graphql"
+# LeetCode's GraphQL error for an unknown username, e.g.
+# {"errors": [{"message": "That user does not exist."}], "data": {...: null}}
+_USER_NOT_FOUND = "user does not exist"
 
 QUERY = """
 query recentAcSubmissions($username: String!, $limit: Int!) {
@@ -19,19 +27,69 @@ query recentAcSubmissions($username: String!, $limit: Int!) {
 """
 
 
-async def _request_recent(username: str, limit: int = 20) -> list[dict]:
+async def _request_recent(username: str, limit: int = 20) -> list[dict] | None:
+    """Fetch recent accepted submissions; None when LeetCode could not be reached."""
+    if upstream.is_bad_handle("leetcode", username):
+        return []
     payload = {"query": QUERY, "variables": {"username": username, "limit": limit}}
     async with httpx.AsyncClient(timeout=10) as client:
         for attempt in range(3):
-            try:
-                resp = await client.post(LEETCODE_GRAPHQL, json=payload)
-                resp.raise_for_status()
-                data = resp.json()
-                return data.get("data", {}).get("recentAcSubmissionList", [])
-            except Exception as exc:
-                log.warning("LeetCode API error: %s", exc)
+            if not leetcode_breaker.allow():
+                break
+            if attempt:
+                metrics.UPSTREAM_RETRIES.inc(provider="leetcode", operation="recent_ac")
+            start = time.perf_counter()
+            status = "error"
+            kind = upstream.TRANSIENT
+            with tracing.span("leetcode.recent_ac", attempt=attempt) as sp:
+                try:
+                    resp = await client.post(settings.leetcode_graphql_url, json=payload)
+                    status = str(resp.status_code)
+                    resp.raise_for_status()
+                    data = resp.json()
+                    submissions = (data.get("data") or {}).get("recentAcSubmissionList")
+                    if submissions is None:
+                        raise _graphql_error(username, data)
+                    leetcode_breaker.record_success()
+                    return submissions
+                except Exception as exc:
+                    kind = upstream.record_error("leetcode", exc)
+                    log.warning("LeetCode API error (%s): %s", kind, exc)
+                    leetcode_breaker.record(exc)
+                finally:
+                    if sp:
+                        sp.attrs["status"] = status
+                    metrics.UPSTREAM_REQUEST_SECONDS.observe(
+                        time.perf_counter() - start,
+                        provider="leetcode",
+                        operation="recent_ac",
+                        status=status,
+                    )
+            if kind == upstream.NOT_FOUND:
+                upstream.mark_bad_handle("leetcode", username)
+                return []
+            if kind != upstream.TRANSIENT or attempt == 2 or leetcode_breaker.state != CLOSED:
+                break
+            with tracing.span("leetcode.retry_sleep", seconds=1 + attempt):
                 await asyncio.sleep(1 + attempt)
-    return []
+    return None
+
+
+class GraphQLError(Exception):
+    """A 200 reply without data; retried like any transient failure."""
+
+
+def _graphql_error(username: str, data: dict) -> Exception:
+    """Unknown users come back as a null list with a "does not exist" error.
+
+    A null list for any other reason (rate limiting, a backend error) must
+    not get the handle cached as bad.
+    """
+    errors = data.get("errors") if isinstance(data.get("errors"), list) else []
+    messages = [str(error.get("message", "")) for error in errors if isinstance(error, dict)]
+    if any(_USER_NOT_FOUND in message.lower() for message in messages):
+        return upstream.HandleNotFound(username)
+    return GraphQLError("; ".join(messages) or "recentAcSubmissionList is null")
 
 
 def _is_today(ts: str, tz_name: str) -> bool:
@@ -40,8 +98,11 @@ def _is_today(ts: str, tz_name: str) -> bool:
     return dt.date() == today
 
 
-async def count_accepted_today(username: str, tz_name: str) -> int:
+@tracing.traced("leetcode.count_accepted_today")
+async def count_accepted_today(username: str, tz_name: str) -> int | None:
     submissions = await _request_recent(username)
+    if submissions is None:
+        return None
     total = 0
     for sub in submissions:
         if _is_today(sub.get("timestamp", "0"), tz_name):
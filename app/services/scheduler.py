@@ -1,12 +1,16 @@
 import json
 import logging
 from zoneinfo import ZoneInfo
+from datetime import datetime, timezone
+from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED, JobEvent
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from aiogram import Bot
 
+from app.core import metrics
+from app.core.config import settings
 from app.db import repo
-from app.services import github, leetcode, streaks
-from app.services.timeutils import now_in_tz
+from app.services import digest
+from app.services.status import status_service
 
 log = logging.getLogger(__name__)
 
@@ -18,10 +22,17 @@ def set_scheduler_instance(instance: "ReminderScheduler") -> None:
     scheduler_instance = instance
 
 
+def get_scheduler_instance() -> "ReminderScheduler | None":
+    return scheduler_instance
+
+
 class ReminderScheduler:
     def __init__(self, bot: Bot):
         self.bot = bot
         self.scheduler = AsyncIOScheduler()
+        self.scheduler.add_listener(self._record_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED)
+        self.active = False
+        self._scheduled: dict[int, tuple[str, tuple[str, ...]]] = {}
 
     def start(self) -> None:
         self.scheduler.start()
@@ -29,12 +40,46 @@ class ReminderScheduler:
     def shutdown(self) -> None:
         self.scheduler.shutdown()
 
-    async def schedule_for_user(self, telegram_id: int) -> None:
-        user = await repo.get_user(telegram_id)
-        if not user:
+    def _record_job_event(self, event: JobEvent) -> None:
+        job = event.job_id.split(":", 1)[0]
+        if event.code == EVENT_JOB_MISSED:
+            metrics.SCHEDULER_JOBS_MISSED.inc(job=job)
+            return
+        now = datetime.now(timezone.utc)
+        for run_time in getattr(event, "scheduled_run_times", []):
+            metrics.SCHEDULER_JOB_LAG_SECONDS.observe(max((now - run_time).total_seconds(), 0.0), job=job)
+
+    async def activate(self) -> None:
+        self.active = True
+        await self.schedule_all_users()
+        self.scheduler.add_job(
+            self.schedule_all_users,
+            "interval",
+            id="reminder-sync",
+            seconds=settings.reminder_sync_seconds,
+            replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_digest,
+            "cron",
+            id="weekly-digest",
+            day_of_week="sun",
+            hour=settings.digest_hour,
+            timezone=ZoneInfo(settings.timezone_default),
+            # Reruns skip users already sent, so a late start is harmless.
+            misfire_grace_time=3600,
+            replace_existing=True,
+        )
+
+    async def deactivate(self) -> None:
+        self.active = False
+        self.scheduler.remove_all_jobs()
+        self._scheduled.clear()
+
+    def _apply_reminders(self, telegram_id: int, tz_name: str, reminders: list[str]) -> None:
+        wanted = (tz_name, tuple(reminders))
+        if self._scheduled.get(telegram_id) == wanted:
             return
-        reminders = json.loads(user["reminders_json"])
-        tz_name = user["tz"]
 
         for job in self.scheduler.get_jobs():
             if job.id.startswith(f"reminder:{telegram_id}:"):
@@ -53,42 +98,40 @@ class ReminderScheduler:
                 args=[telegram_id],
                 replace_existing=True,
             )
+        self._scheduled[telegram_id] = wanted
+
+    async def schedule_for_user(self, telegram_id: int) -> None:
+        if not self.active:
+            return
+        user = await repo.get_user(telegram_id)
+        if not user:
+            return
+        self._apply_reminders(telegram_id, user.tz, user.reminders)
 
     async def schedule_all_users(self) -> None:
-        rows = await repo.fetchall("SELECT telegram_id FROM users")
+        if not self.active:
+            return
+        rows = await repo.fetchall("SELECT telegram_id, tz, reminders_json FROM users")
         for row in rows:
-            await self.schedule_for_user(int(row["telegram_id"]))
+            telegram_id = int(row["telegram_id"])
+            reminders = json.loads(row["reminders_json"])
+            if telegram_id in self._scheduled and self._scheduled[telegram_id] != (row["tz"], tuple(reminders)):
+                # Settings changed on another replica; drop our cached copy too.
+                repo.invalidate_user(telegram_id)
+            self._apply_reminders(telegram_id, row["tz"], reminders)
+
+    async def _run_digest(self) -> None:
+        await digest.run_weekly_digest(self.bot)
 
     async def _run_reminder(self, telegram_id: int) -> None:
         user = await repo.get_user(telegram_id)
         if not user:
             return
-        tz_name = user["tz"]
-        goals = json.loads(user["goals_json"])
-        repos = json.loads(user["repos_json"])
-        gh_user = user.get("github_username")
-        lc_user = user.get("leetcode_username")
-
-        github_commits = 0
-        leetcode_solved = 0
-        if gh_user:
-            github_commits = await github.count_commits_today(gh_user, tz_name, repos)
-        if lc_user:
-            leetcode_solved = await leetcode.count_accepted_today(lc_user, tz_name)
-
-        today = now_in_tz(tz_name).date()
-        await repo.upsert_daily_stats(
-            telegram_id,
-            today.isoformat(),
-            github_commits,
-            leetcode_solved,
-        )
-        await streaks.update_streak_for_date(
-            telegram_id,
-            today,
-            goals,
-            {"github_commits": github_commits, "leetcode_solved": leetcode_solved},
-        )
+        # No deadline: a reminder can wait for slow providers.
+        status = await status_service.get(user)
+        goals = status["goals"]
+        github_commits = status["github_commits"]
+        leetcode_solved = status["leetcode_solved"]
 
         gh_goal = int(goals.get("github_commits", 0))
         lc_goal = int(goals.get("leetcode_solved", 0))
@@ -96,7 +139,7 @@ class ReminderScheduler:
         lc_left = max(lc_goal - int(leetcode_solved), 0)
 
         if gh_left == 0 and lc_left == 0:
-            log.info("Reminder skipped: goals completed for %s on %s", telegram_id, today.isoformat())
+            log.info("Reminder skipped: goals completed for %s on %s", telegram_id, status["date"])
             return
 
         msg = (
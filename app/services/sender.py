@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+from typing import Iterable
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramNotFound, TelegramRetryAfter
+
+from app.core import metrics
+from app.services.ratelimit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+SENT = "sent"
+BLOCKED = "blocked"
+FAILED = "failed"
+
+
+class RateLimitedSender:
+    """Broadcasts bot messages within Telegram's bulk limit.
+
+    Sends are paced by a token bucket shared by `concurrency` workers. When
+    Telegram answers 429, every worker waits out the retry_after it asks for.
+    """
+
+    def __init__(self, bot: Bot, rate: float, concurrency: int = 8) -> None:
+        self.bot = bot
+        # No burst allowance: Telegram counts sends per second.
+        self.bucket = TokenBucket(rate, 1.0)
+        self.concurrency = max(concurrency, 1)
+        self._resume_at = 0.0
+
+    async def send(self, chat_id: int, text: str) -> str:
+        for _ in range(3):
+            await self.bucket.acquire()
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.bot.send_message(chat_id, text)
+            except TelegramRetryAfter as exc:
+                self._resume_at = max(self._resume_at, time.monotonic() + exc.retry_after)
+                continue
+            except (TelegramForbiddenError, TelegramNotFound):
+                result = BLOCKED
+            except Exception as exc:
+                log.warning("Failed to send message to %s: %s", chat_id, exc)
+                result = FAILED
+            else:
+                result = SENT
+            metrics.BOT_MESSAGES_SENT.inc(result=result)
+            return result
+        metrics.BOT_MESSAGES_SENT.inc(result=FAILED)
+        return FAILED
+
+    async def send_many(self, messages: Iterable[tuple[int, str]]) -> dict[int, str]:
+        """Send every (chat_id, text); returns the result per chat."""
+        queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+        for message in messages:
+            queue.put_nowait(message)
+        results: dict[int, str] = {}
+
+        async def worker() -> None:
+            while not queue.empty():
+                chat_id, text = queue.get_nowait()
+                results[chat_id] = await self.send(chat_id, text)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, queue.qsize()))))
+        return results
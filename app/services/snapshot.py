@@ -0,0 +1,80 @@
+"""Carry in-memory caches across a restart.
+
+On shutdown the status cache and GitHub's ETag and compare caches are written
+to the cache_snapshots table as one zlib-compressed JSON document, one row per
+replica (keyed by hostname). On startup the recent rows of all replicas are
+merged, newest first, and loaded back before traffic is served, minus
+whatever expired while the process was down. A snapshot written by a
+different SNAPSHOT_VERSION is ignored, so changing a cache's layout only
+costs one cold start.
+"""
+
+import base64
+import json
+import logging
+import socket
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from app.core.jsoncodec import dumps
+from app.db import repo
+from app.services import github
+from app.services.status import status_service
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+# Nothing in a snapshot outlives GitHub's one-day ETag validators, and rows
+# of replicas that are gone are dropped after the same time.
+SNAPSHOT_MAX_AGE = timedelta(days=1)
+SNAPSHOT_MERGE_MAX = 8
+
+
+def snapshot_name() -> str:
+    return f"caches:{socket.gethostname()}"
+
+
+def _cutoff() -> str:
+    return (datetime.utcnow() - SNAPSHOT_MAX_AGE).isoformat()
+
+
+async def save() -> None:
+    started = time.perf_counter()
+    document = {
+        "status": status_service.snapshot(),
+        "github": github.snapshot_caches(),
+    }
+    payload = base64.b64encode(zlib.compress(dumps(document))).decode("ascii")
+    await repo.save_cache_snapshot(snapshot_name(), SNAPSHOT_VERSION, payload, prune_before=_cutoff())
+    log.info(
+        "Saved cache snapshot: %d status entries, %d bytes in %.0fms",
+        len(document["status"]),
+        len(payload),
+        (time.perf_counter() - started) * 1000,
+    )
+
+
+async def restore() -> None:
+    status_count = github_count = 0
+    restored = []
+    for row in await repo.load_cache_snapshots(_cutoff(), SNAPSHOT_MERGE_MAX):
+        if int(row["version"]) != SNAPSHOT_VERSION:
+            log.info("Ignoring cache snapshot %s version %s (want %d)", row["name"], row["version"], SNAPSHOT_VERSION)
+            continue
+        try:
+            document = json.loads(zlib.decompress(base64.b64decode(row["payload"])))
+            # Caches keep the first value they get, so the newest row wins.
+            status_count += status_service.restore(document.get("status", []))
+            github_count += github.restore_caches(document.get("github", {}))
+        except (ValueError, TypeError, KeyError, zlib.error) as exc:
+            log.warning("Ignoring unreadable cache snapshot %s: %s", row["name"], exc)
+            continue
+        restored.append(f"{row['name']} ({row['saved_at']})")
+    if restored:
+        log.info(
+            "Restored cache snapshots %s: %d status, %d github entries",
+            ", ".join(restored),
+            status_count,
+            github_count,
+        )
@@ -0,0 +1,303 @@
+"""Today's numbers and streak for a user.
+
+The WebApp, the bot's /status and the reminder job all go through
+status_service, so they share the provider cache, the in-flight fetches and
+the stale fallback rules.
+"""
+
+import asyncio
+import functools
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable
+
+from app.core import metrics, tracing
+from app.core.config import settings
+from app.db import repo
+from app.services import events, github, leetcode, streaks, upstream
+from app.services.ratelimit import TokenBucket
+from app.services.timeutils import now_in_tz
+
+log = logging.getLogger(__name__)
+
+_STATUS_TTL_SECONDS = 25
+# Per-user force buckets kept; past this the least recently used is evicted.
+# An evicted user just gets a fresh burst, which the global limit still caps.
+_FORCE_BUCKETS_MAX = 4096
+
+CacheKey = tuple[int, str, str]
+
+
+def _handle(value: str | None) -> str | None:
+    cleaned = (value or "").strip()
+    return cleaned or None
+
+
+def request_deadline() -> float | None:
+    """Monotonic time by which an interactive status must be answered."""
+    if settings.status_deadline_seconds <= 0:
+        return None
+    return time.monotonic() + settings.status_deadline_seconds
+
+
+class StatusService:
+    def __init__(
+        self,
+        ttl_seconds: float = _STATUS_TTL_SECONDS,
+        force_per_user: float = settings.force_refresh_per_user,
+        force_global: float = settings.force_refresh_global,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._cache: dict[CacheKey, tuple[int, float]] = {}
+        self._fetches: dict[CacheKey, asyncio.Task] = {}
+        # force_per_user is per minute with a burst of the same size;
+        # force_global is per second. 0 turns a limit off.
+        self.force_per_user = force_per_user
+        self._force_users: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._force_global = TokenBucket(force_global, force_global) if force_global > 0 else None
+
+    def cache_get(self, key: CacheKey) -> int | None:
+        entry = self._cache.get(key)
+        if not entry:
+            metrics.CACHE_REQUESTS.inc(cache="status", result="miss")
+            return None
+        value, ts = entry
+        if time.time() - ts > self.ttl_seconds:
+            self._cache.pop(key, None)
+            metrics.CACHE_REQUESTS.inc(cache="status", result="expired")
+            return None
+        metrics.CACHE_REQUESTS.inc(cache="status", result="hit")
+        return value
+
+    def cache_set(self, key: CacheKey, value: int) -> None:
+        self._cache[key] = (int(value), time.time())
+
+    def snapshot(self) -> list[list[Any]]:
+        now = time.time()
+        return [[*key, value, ts] for key, (value, ts) in self._cache.items() if now - ts <= self.ttl_seconds]
+
+    def restore(self, entries: list[list[Any]]) -> int:
+        """Load snapshot() output, dropping entries that have since expired."""
+        now = time.time()
+        restored = 0
+        for telegram_id, day, field, value, ts in entries:
+            if now - ts <= self.ttl_seconds:
+                self._cache.setdefault((int(telegram_id), day, field), (int(value), ts))
+                restored += 1
+        return restored
+
+    def force_wait(self, telegram_id: int) -> float:
+        """Spend one forced refresh; 0 if allowed, else seconds until the next one is."""
+        bucket = None
+        if self.force_per_user > 0:
+            bucket = self._force_users.get(telegram_id)
+            if bucket is None:
+                if len(self._force_users) >= _FORCE_BUCKETS_MAX:
+                    self._force_users.popitem(last=False)
+                bucket = TokenBucket(self.force_per_user / 60, self.force_per_user)
+                self._force_users[telegram_id] = bucket
+            else:
+                self._force_users.move_to_end(telegram_id)
+            wait = bucket.try_acquire()
+            if wait:
+                metrics.FORCE_REFRESHES.inc(result="user_limited")
+                return wait
+        if self._force_global is not None:
+            wait = self._force_global.try_acquire()
+            if wait:
+                if bucket is not None:
+                    # The user didn't get a refresh; don't charge them for it.
+                    bucket.tokens = min(bucket.capacity, bucket.tokens + 1)
+                metrics.FORCE_REFRESHES.inc(result="global_limited")
+                return wait
+        metrics.FORCE_REFRESHES.inc(result="allowed")
+        return 0.0
+
+    def _start_fetch(self, key: CacheKey, fetch: Callable[[], Awaitable[int | None]]) -> asyncio.Task:
+        """Start a provider fetch for key, or join the one already running.
+
+        The task outlives the caller that started it, so a fetch that misses
+        the deadline still lands in the cache for the next caller.
+        """
+        task = self._fetches.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._fetches[key] = task
+            task.add_done_callback(functools.partial(self._finish_fetch, key))
+        return task
+
+    def _finish_fetch(self, key: CacheKey, task: asyncio.Task) -> None:
+        self._fetches.pop(key, None)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            log.warning("Status fetch %s failed: %s", key[2], exc)
+        elif task.result() is not None:
+            self.cache_set(key, task.result())
+            telegram_id, day, field = key
+            events.publish(telegram_id, {"date": day, field: int(task.result())})
+
+    @staticmethod
+    def _fetch_result(task: asyncio.Task) -> int | None:
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+
+    def settled_counts(
+        self,
+        user: repo.UserRecord,
+        day: str,
+        today_row: dict[str, Any] | None,
+    ) -> tuple[int, int] | None:
+        """Numbers get() would serve without fetching, if it wouldn't fetch."""
+        github_commits: int | None = 0
+        leetcode_solved: int | None = 0
+        if _handle(user.github_username):
+            if user.github_webhook:
+                github_commits = int(today_row["github_commits"]) if today_row else 0
+            else:
+                github_commits = self.cache_get((user.telegram_id, day, "github_commits"))
+        if _handle(user.leetcode_username):
+            leetcode_solved = self.cache_get((user.telegram_id, day, "leetcode_solved"))
+        if github_commits is None or leetcode_solved is None:
+            return None
+        return github_commits, leetcode_solved
+
+    async def get(
+        self,
+        user: repo.UserRecord,
+        *,
+        today: date | None = None,
+        force: bool = False,
+        deadline: float | None = None,
+        stored: tuple[dict[str, Any] | None, dict[str, Any] | None] | None = None,
+    ) -> dict[str, Any]:
+        """Fetch today's numbers, save them with the streak and return the status.
+
+        Both providers are fetched concurrently; cached numbers are used
+        unless force is set. A forced refresh over the per-user or global
+        limit is served like an unforced one, with "retry_after" set to the
+        seconds until force is allowed again. A provider that fails or misses deadline (a
+        time.monotonic() value; None waits) is reported in "stale" and
+        served from today's stored row. stored is (today's daily_stats
+        row, streaks row) when the caller has already read them.
+        """
+        telegram_id = user.telegram_id
+        tz_name = user.tz
+        goals = user.goals
+        repos = user.repos
+        gh_user = _handle(user.github_username)
+        lc_user = _handle(user.leetcode_username)
+        today = today or now_in_tz(tz_name).date()
+        today_str = today.isoformat()
+        gh_key = (telegram_id, today_str, "github_commits")
+        lc_key = (telegram_id, today_str, "leetcode_solved")
+
+        retry_after = None
+        if force:
+            wait = self.force_wait(telegram_id)
+            if wait:
+                force = False
+                retry_after = math.ceil(wait)
+
+        loaded = stored is not None
+        today_row, streak_row = stored or (None, None)
+
+        async def load_stored() -> dict[str, Any] | None:
+            nonlocal loaded, today_row, streak_row
+            if not loaded:
+                streak_row, rows = await repo.get_streak_and_history(telegram_id, today_str, today_str)
+                today_row = rows[0] if rows else None
+                loaded = True
+            return today_row
+
+        github_commits = None
+        leetcode_solved = None
+        webhook = bool(gh_user and user.github_webhook)
+        if webhook:
+            row = await load_stored()
+            github_commits = int(row["github_commits"]) if row else 0
+        if not force:
+            if gh_user and github_commits is None:
+                github_commits = self.cache_get(gh_key)
+            if lc_user:
+                leetcode_solved = self.cache_get(lc_key)
+
+        fetches: dict[str, asyncio.Task] = {}
+        if gh_user and github_commits is None:
+            fetches["github"] = self._start_fetch(gh_key, lambda: github.count_commits_today(gh_user, tz_name, repos))
+        if lc_user and leetcode_solved is None:
+            fetches["leetcode"] = self._start_fetch(lc_key, lambda: leetcode.count_accepted_today(lc_user, tz_name))
+
+        stale: list[str] = []
+        if fetches:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            # Read the stored row while the providers are in flight; it is
+            # needed for the streak and for any stale fallback.
+            await asyncio.gather(load_stored(), asyncio.wait(fetches.values(), timeout=timeout))
+            for key, task in fetches.items():
+                value = self._fetch_result(task)
+                if value is None:
+                    stale.append(key)
+                elif key == "github":
+                    github_commits = int(value)
+                else:
+                    leetcode_solved = int(value)
+        else:
+            await load_stored()
+
+        if "github" in stale:
+            github_commits = int(today_row["github_commits"]) if today_row else 0
+        if "leetcode" in stale:
+            leetcode_solved = int(today_row["leetcode_solved"]) if today_row else 0
+        if github_commits is None:
+            github_commits = 0
+        if leetcode_solved is None:
+            leetcode_solved = 0
+
+        counts = {"github_commits": github_commits, "leetcode_solved": leetcode_solved}
+        streak_info, streak_changed = streaks.advance_streak(streak_row, today, goals, counts)
+        with tracing.span("status.save_day"):
+            # Webhook pushes increment github_commits concurrently; never
+            # write back the count read above, take the stored one instead.
+            saved_commits, _ = await repo.save_day(
+                telegram_id,
+                today_str,
+                None if webhook else github_commits,
+                leetcode_solved,
+                streak_info if streak_changed or streak_row is None else None,
+            )
+            if saved_commits != github_commits:
+                github_commits = counts["github_commits"] = saved_commits
+                pushed_info, pushed_changed = streaks.advance_streak(streak_row, today, goals, counts)
+                if pushed_changed and pushed_info != streak_info:
+                    streak_info = pushed_info
+                    await repo.save_day(telegram_id, today_str, None, leetcode_solved, streak_info)
+        events.publish(telegram_id, {"date": today_str, **counts, "streak": streak_info})
+
+        return {
+            "needs_setup": False,
+            "date": today_str,
+            "timezone": tz_name,
+            "github_commits": github_commits,
+            "leetcode_solved": leetcode_solved,
+            "goals": goals,
+            "reminders": user.reminders,
+            "repos": repos,
+            "streak": streak_info,
+            "avatar": user.avatar,
+            "github_webhook": user.github_webhook,
+            "github_username": gh_user,
+            "leetcode_username": lc_user,
+            "fresh": [key for key in ("github", "leetcode") if key not in stale],
+            "stale": stale,
+            "unknown_handles": upstream.bad_handles(gh_user, lc_user),
+            "retry_after": retry_after,
+        }
+
+
+status_service = StatusService()
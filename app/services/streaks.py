@@ -1,8 +1,6 @@
 from datetime import date, timedelta
 from typing import Any
 
-from app.db import repo
-
 
 def _goals_met(goals: dict[str, int], stats: dict[str, int]) -> bool:
     return (
@@ -11,28 +9,28 @@ def _goals_met(goals: dict[str, int], stats: dict[str, int]) -> bool:
     )
 
 
-async def update_streak_for_date(
-    telegram_id: int,
+def advance_streak(
+    streaks: dict[str, Any] | None,
     current_date: date,
     goals: dict[str, int],
     stats: dict[str, int],
-) -> dict[str, Any]:
-    streaks = await repo.get_streaks(telegram_id)
-    if not streaks:
-        await repo.update_streaks(telegram_id, 0, 0, None)
-        streaks = await repo.get_streaks(telegram_id)
-    assert streaks
+) -> tuple[dict[str, Any], bool]:
+    """Streak after today's numbers, and whether it changed and needs saving.
 
+    streaks is the user's streaks row (None if missing). Meeting the goals
+    extends a streak that last succeeded yesterday and restarts any other.
+    """
+    streaks = streaks or {}
     last_success = streaks.get("last_success_date")
-    current = int(streaks.get("current_streak", 0))
-    best = int(streaks.get("best_streak", 0))
+    current = int(streaks.get("current_streak") or 0)
+    best = int(streaks.get("best_streak") or 0)
 
     if not _goals_met(goals, stats):
-        return {"current_streak": current, "best_streak": best, "last_success_date": last_success}
+        return {"current_streak": current, "best_streak": best, "last_success_date": last_success}, False
 
     last_success_date = date.fromisoformat(last_success) if last_success else None
     if last_success_date == current_date:
-        return {"current_streak": current, "best_streak": best, "last_success_date": last_success}
+        return {"current_streak": current, "best_streak": best, "last_success_date": last_success}, False
 
     if last_success_date == current_date - timedelta(days=1):
         current += 1
@@ -40,6 +38,4 @@ async def update_streak_for_date(
         current = 1
     if current > best:
         best = current
-
-    await repo.update_streaks(telegram_id, current, best, current_date.isoformat())
-    return {"current_streak": current, "best_streak": best, "last_success_date": current_date.isoformat()}
+    return {"current_streak": current, "best_streak": best, "last_success_date": current_date.isoformat()}, True
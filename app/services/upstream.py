@@ -0,0 +1,68 @@
+import time
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+
+NOT_FOUND = "not_found"
+AUTH = "auth"
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+# Any other 4xx: the request itself was refused and repeating it won't help.
+REJECTED = "rejected"
+
+_BAD_HANDLES: dict[tuple[str, str], float] = {}
+
+
+class HandleNotFound(Exception):
+    """The provider answered that the user handle does not exist."""
+
+
+def classify(exc: BaseException) -> str:
+    if isinstance(exc, HandleNotFound):
+        return NOT_FOUND
+    if isinstance(exc, httpx.HTTPStatusError):
+        resp = exc.response
+        status = resp.status_code
+        if status in (404, 410):
+            return NOT_FOUND
+        if status == 429 or (status == 403 and resp.headers.get("X-RateLimit-Remaining") == "0"):
+            return RATE_LIMITED
+        if status in (401, 403):
+            return AUTH
+        if status < 500:
+            return REJECTED
+    return TRANSIENT
+
+
+def record_error(provider: str, exc: BaseException) -> str:
+    kind = classify(exc)
+    metrics.UPSTREAM_ERRORS.inc(provider=provider, kind=kind)
+    return kind
+
+
+def mark_bad_handle(provider: str, handle: str) -> None:
+    _BAD_HANDLES[(provider, handle.lower())] = time.monotonic()
+
+
+def is_bad_handle(provider: str, handle: str | None) -> bool:
+    if not handle:
+        return False
+    key = (provider, handle.lower())
+    marked_at = _BAD_HANDLES.get(key)
+    if marked_at is None:
+        return False
+    if time.monotonic() - marked_at > settings.bad_handle_ttl_seconds:
+        _BAD_HANDLES.pop(key, None)
+        return False
+    return True
+
+
+def bad_handles(github_username: str | None, leetcode_username: str | None) -> list[str]:
+    providers = []
+    if is_bad_handle("github", github_username):
+        providers.append("github")
+    if is_bad_handle("leetcode", leetcode_username):
+        providers.append("leetcode")
+    return providers
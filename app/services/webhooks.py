@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+import logging
+from datetime import datetime, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from app.db import repo
+from app.services import events
+
+log = logging.getLogger(__name__)
+
+
+def verify_github_signature(body: bytes, signature: str | None, secret: str) -> bool:
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature[len("sha256="):], expected)
+
+
+def push_commit_count(payload: dict[str, Any]) -> int:
+    if payload.get("deleted"):
+        return 0
+    commits = payload.get("commits") or []
+    if not isinstance(commits, list):
+        return 0
+    return sum(1 for commit in commits if isinstance(commit, dict) and commit.get("distinct", True))
+
+
+def push_login(payload: dict[str, Any]) -> str:
+    sender = payload.get("sender") or {}
+    pusher = payload.get("pusher") or {}
+    return (sender.get("login") or pusher.get("name") or "").strip()
+
+
+def _pushed_at(payload: dict[str, Any]) -> datetime:
+    pushed_at = (payload.get("repository") or {}).get("pushed_at")
+    if isinstance(pushed_at, (int, float)) and pushed_at > 0:
+        return datetime.fromtimestamp(pushed_at, tz=timezone.utc)
+    return datetime.now(timezone.utc)
+
+
+async def handle_github_push(delivery_id: str, payload: dict[str, Any], telegram_id: int | None = None) -> int:
+    """Count a push payload for every opted-in user with a matching handle.
+
+    telegram_id limits it to that user, for deliveries to their own hook.
+    Returns the number of users whose daily stats were incremented; 0 when
+    the delivery was already processed.
+    """
+    login = push_login(payload)
+    repo_full = (payload.get("repository") or {}).get("full_name", "")
+    commits = push_commit_count(payload)
+    if not login:
+        return 0
+
+    pushed_at = _pushed_at(payload)
+    increments: list[tuple[int, str, int]] = []
+    if commits > 0:
+        for user in await repo.get_users_by_github_username(login):
+            if not user.github_webhook or telegram_id not in (None, user.telegram_id):
+                continue
+            if user.repos and repo_full not in user.repos:
+                continue
+            local_date = pushed_at.astimezone(ZoneInfo(user.tz)).date().isoformat()
+            increments.append((user.telegram_id, local_date, commits))
+
+    applied = await repo.record_github_push(delivery_id, increments)
+    if not applied:
+        log.info("GitHub webhook duplicate delivery: %s", delivery_id)
+        return 0
+    log.info(
+        "GitHub webhook push: delivery=%s login=%s repo=%s commits=%d users=%d",
+        delivery_id,
+        login,
+        repo_full,
+        commits,
+        len(increments),
+    )
+    for telegram_id, local_date, _ in increments:
+        if events.has_subscribers(telegram_id):
+            row = await repo.get_daily_stats(telegram_id, local_date)
+            if row:
+                events.publish(telegram_id, {"date": local_date, "github_commits": int(row["github_commits"])})
+    return len(increments)
@@ -0,0 +1,142 @@
+"""Export and import users, streaks and daily_stats.
+
+Usage:
+    python -m app.tools.data export backup/ [--format ndjson|csv]
+    python -m app.tools.data import backup/
+
+Export writes one <table>.ndjson or <table>.csv per table to the directory.
+Rows are streamed from the database, so memory use does not grow with table
+size. Import reads whichever of those files exist and upserts them in
+batches. Running it twice gives the same result. The database comes from the
+usual DATABASE_URL / DATABASE_PATH settings, so moving SQLite to Postgres is
+an export with DATABASE_URL unset followed by an import with it set.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.db import repo
+from app.db.writer import close_writer
+
+log = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+
+async def _export_table(table: str, path: Path, fmt: str, batch_size: int) -> int:
+    columns, _ = repo.TABLES[table]
+    count = 0
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh) if fmt == "csv" else None
+        if writer is not None:
+            writer.writerow(columns)
+        async for row in repo.iter_rows(table, batch_size):
+            if writer is not None:
+                writer.writerow(["" if row[col] is None else row[col] for col in columns])
+            else:
+                fh.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def _read_ndjson(path: Path) -> Iterator[dict[str, Any]]:
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_csv(path: Path) -> Iterator[dict[str, Any]]:
+    with path.open(encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            # CSV has no null: empty cells come back as None.
+            yield {
+                col: None if value == "" else int(value) if col in repo.INTEGER_COLUMNS else value
+                for col, value in row.items()
+            }
+
+
+def _batches(rows: Iterator[dict[str, Any]], columns: tuple[str, ...], size: int) -> Iterator[list[tuple[Any, ...]]]:
+    batch: list[tuple[Any, ...]] = []
+    for row in rows:
+        batch.append(tuple(row.get(col) for col in columns))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _import_table(table: str, path: Path, batch_size: int) -> int:
+    columns, _ = repo.TABLES[table]
+    rows = _read_csv(path) if path.suffix == ".csv" else _read_ndjson(path)
+    count = 0
+    for batch in _batches(rows, columns, batch_size):
+        await repo.upsert_rows(table, batch)
+        count += len(batch)
+    return count
+
+
+def _find_source(directory: Path, table: str) -> Path | None:
+    for fmt in FORMATS:
+        path = directory / f"{table}.{fmt}"
+        if path.exists():
+            return path
+    return None
+
+
+async def run(args: argparse.Namespace) -> int:
+    await repo.init_db()
+    directory = Path(args.directory)
+    tables = args.tables or list(repo.TABLES)
+    try:
+        if args.command == "export":
+            directory.mkdir(parents=True, exist_ok=True)
+            for table in tables:
+                started = time.perf_counter()
+                path = directory / f"{table}.{args.format}"
+                count = await _export_table(table, path, args.format, args.batch_size)
+                log.info("Exported %d %s rows to %s in %.2fs", count, table, path, time.perf_counter() - started)
+            return 0
+        for table in tables:
+            path = _find_source(directory, table)
+            if path is None:
+                log.warning("No %s.ndjson or %s.csv in %s; skipped", table, table, directory)
+                continue
+            started = time.perf_counter()
+            count = await _import_table(table, path, args.batch_size)
+            log.info("Imported %d %s rows from %s in %.2fs", count, table, path, time.perf_counter() - started)
+        if {"daily_stats", "streaks"} & set(tables):
+            await repo.rebuild_leaderboard()
+        return 0
+    finally:
+        await close_writer()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("directory")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson", help="export file format")
+    parser.add_argument("--tables", nargs="+", choices=list(repo.TABLES), help="default: all")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    args.batch_size = max(args.batch_size, 1)
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
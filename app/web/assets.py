@@ -0,0 +1,231 @@
+"""Startup build of the WebApp's JS/CSS.
+
+Each asset is minified, fingerprinted with a content hash and precompressed
+in memory, then served from /assets/<name>.<hash>.<ext> as immutable.
+Templates link to it through asset_url().
+"""
+
+import gzip
+import hashlib
+import logging
+import re
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+BUILD_FILES = ("app.js", "styles.css")
+MEDIA_TYPES = {".js": "application/javascript", ".css": "text/css"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class Asset:
+    __slots__ = ("name", "media_type", "etag", "identity", "gzip", "br")
+
+    def __init__(self, name: str, media_type: str, body: bytes, digest: str) -> None:
+        self.name = name
+        self.media_type = media_type
+        self.etag = f'"{digest}"'
+        self.identity = body
+        self.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+        self.br = brotli.compress(body, quality=11) if brotli else None
+
+    def encoded(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+        if self.br is not None and "br" in accepted:
+            return self.br, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.identity, None
+
+
+_ASSETS: dict[str, Asset] = {}
+_URLS: dict[str, str] = {}
+
+
+_IDENT = re.compile(r"[\w$\u0080-\uffff]")
+# After these characters a line break never ends a statement, and before the
+# second set it never starts one, so dropping it can't change how ASI applies.
+_JOINS_AFTER = set("{[(,;:=&|?!<>*%~^")
+_JOINS_BEFORE = set("}]),;:.?=&|<>*%")
+# A "/" after these keywords starts a regex, not a division.
+_REGEX_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await"}
+
+
+def _needs_space(prev: str, nxt: str) -> bool:
+    if _IDENT.match(prev) and _IDENT.match(nxt):
+        return True
+    if prev.isdigit() and nxt == ".":
+        return True  # "1 .toFixed()"
+    # Keep "a + +b", "a - -b" and "x / /re/" from fusing into other tokens.
+    return prev == nxt and prev in "+-/" or (prev == "/" and nxt == "*")
+
+
+def _scan_quoted(source: str, i: int, quote: str) -> int:
+    """Index just past the string or regex body that starts at source[i]."""
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if quote == "/" and char == "[":
+            in_class = True
+        elif quote == "/" and char == "]":
+            in_class = False
+        elif char == quote and not in_class:
+            return i + 1
+        elif char == "\n" and quote != "`":
+            break
+        i += 1
+    return i
+
+
+def minify_js(source: str) -> str:
+    """Drop comments and needless whitespace, tokenizer-aware.
+
+    String, template and regex literals are copied verbatim (template
+    expressions are minified like other code). A line break is kept unless
+    the characters around it make automatic semicolon insertion impossible,
+    so statements without semicolons keep their meaning.
+    """
+    out: list[str] = []
+    pending = ""  # whitespace seen since the last token: "", " " or "\n"
+    # One entry per open template literal: the brace depth its ${ began at.
+    templates: list[int] = []
+    depth = 0
+    last_word = ""
+    i = 0
+    n = len(source)
+
+    def emit(text: str) -> None:
+        nonlocal pending
+        if pending and out:
+            prev = out[-1][-1]
+            if pending == "\n" and prev not in _JOINS_AFTER and text[0] not in _JOINS_BEFORE:
+                out.append("\n")
+            elif _needs_space(prev, text[0]):
+                out.append(" ")
+        pending = ""
+        out.append(text)
+
+    def template_from(start: int) -> int:
+        # Copy template text up to its closing backtick or the next ${.
+        j = start
+        while j < n:
+            if source[j] == "\\":
+                j += 2
+            elif source[j] == "`":
+                return j + 1
+            elif source.startswith("${", j):
+                templates.append(depth)
+                return j + 2
+            else:
+                j += 1
+        return j
+
+    while i < n:
+        char = source[i]
+        if char in " \t\r\n":
+            if char == "\n":
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i += 1
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            if not pending:
+                pending = " "
+        elif char in "'\"":
+            end = _scan_quoted(source, i, char)
+            emit(source[i:end])
+            i, last_word = end, ""
+        elif char == "`":
+            end = template_from(i + 1)
+            emit(source[i:end])
+            i, last_word = end, ""
+        elif char == "}" and templates and templates[-1] == depth:
+            templates.pop()
+            end = template_from(i + 1)
+            pending = ""
+            out.append(source[i:end])
+            i, last_word = end, ""
+        elif char == "/" and (
+            not out or out[-1][-1] in "(,=:[!&|?{};+-*%<>~^" or last_word in _REGEX_KEYWORDS
+        ):
+            end = _scan_quoted(source, i, "/")
+            while end < n and _IDENT.match(source[end]):
+                end += 1  # flags
+            emit(source[i:end])
+            i, last_word = end, ""
+        elif _IDENT.match(char):
+            end = i + 1
+            while end < n and _IDENT.match(source[end]):
+                end += 1
+            last_word = source[i:end]
+            emit(last_word)
+            i = end
+        else:
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+            emit(char)
+            i, last_word = i + 1, ""
+    return "".join(out) + "\n"
+
+
+def minify_css(source: str) -> str:
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", source).replace(";}", "}").strip() + "\n"
+
+
+def _minify(path: Path) -> str:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".js":
+        return minify_js(text)
+    if path.suffix == ".css":
+        return minify_css(text)
+    return text
+
+
+def build(static_dir: Path) -> None:
+    _ASSETS.clear()
+    _URLS.clear()
+    for filename in BUILD_FILES:
+        path = static_dir / filename
+        if not path.exists():
+            continue
+        body = _minify(path).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        hashed = f"{path.stem}.{digest}{path.suffix}"
+        asset = Asset(hashed, MEDIA_TYPES.get(path.suffix, "application/octet-stream"), body, digest)
+        _ASSETS[hashed] = asset
+        _URLS[filename] = f"/assets/{hashed}"
+        log.info(
+            "Asset %s -> %s: %d bytes, gzip %d, br %s",
+            filename,
+            hashed,
+            len(body),
+            len(asset.gzip),
+            len(asset.br) if asset.br is not None else "-",
+        )
+
+
+def get(name: str) -> Asset | None:
+    return _ASSETS.get(name)
+
+
+def asset_url(filename: str) -> str:
+    """Fingerprinted URL of a built asset; the plain /static URL before build()."""
+    return _URLS.get(filename, f"/static/{filename}")
@@ -1,53 +1,126 @@
+import hashlib
+import hmac
 import json
 import logging
 import urllib.parse
 import asyncio
+import functools
 import time
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from pathlib import Path
 from typing import Any
 
+from aiogram import Bot, Dispatcher
 from fastapi import FastAPI, Request, HTTPException, Query
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
+from app.core import jsoncodec, metrics, tracing
 from app.core.config import settings
 from app.db import repo
-from app.services import github, leetcode, streaks
+from app.services import events, leaderboard, upstream, webhooks
+from app.services.status import request_deadline, status_service
 from app.services.timeutils import now_in_tz, parse_time_hhmm, validate_init_data
-from app.services.scheduler import scheduler_instance
+from app.services.scheduler import get_scheduler_instance
+from app.web import assets
 
 log = logging.getLogger(__name__)
 
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialised with the encoder picked by JSON_ENCODER."""
+
+    def render(self, content: Any) -> bytes:
+        return jsoncodec.dumps(content)
+
+
 base_dir = Path(__file__).resolve().parent
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 app.mount("/static", StaticFiles(directory=str(base_dir / "static")), name="static")
 
-templates = Jinja2Templates(directory=str(base_dir / "templates"))
 
-_STATUS_TTL_SECONDS = 25
-_STATUS_CACHE: dict[tuple[int, str, str], tuple[int, float]] = {}
+@functools.cache
+def _templates():
+    # Jinja is only needed for the three HTML pages; load it on first render.
+    from fastapi.templating import Jinja2Templates
+
+    templates = Jinja2Templates(directory=str(base_dir / "templates"))
+    templates.env.globals["asset_url"] = assets.asset_url
+    return templates
+
+
+_EVENTS_KEEPALIVE_SECONDS = 15
+# Let clients keep API responses but revalidate them with If-None-Match.
+_API_CACHE_CONTROL = "private, no-cache"
+
+_bot: Bot | None = None
+_dispatcher: Dispatcher | None = None
+
+
+def set_bot_dispatcher(bot: Bot, dp: Dispatcher) -> None:
+    global _bot, _dispatcher
+    _bot = bot
+    _dispatcher = dp
 
 
 @app.on_event("startup")
 async def startup() -> None:
+    assets.build(base_dir / "static")
     await repo.init_db()
 
 
-def _cache_get(key: tuple[int, str, str]) -> int | None:
-    entry = _STATUS_CACHE.get(key)
-    if not entry:
-        return None
-    value, ts = entry
-    if time.time() - ts > _STATUS_TTL_SECONDS:
-        _STATUS_CACHE.pop(key, None)
-        return None
-    return value
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = "500"
+    with tracing.start_trace("http", method=request.method, path=request.url.path) as root:
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            if root:
+                root.attrs["route"] = route
+                root.attrs["status"] = status
+            metrics.HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=route,
+                status=status,
+            )
+
+
+def _etag(*parts: Any) -> str:
+    return 'W/"' + hashlib.blake2b(jsoncodec.dumps(parts), digest_size=12).hexdigest() + '"'
 
 
-def _cache_set(key: tuple[int, str, str], value: int) -> None:
-    _STATUS_CACHE[key] = (int(value), time.time())
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _API_CACHE_CONTROL})
+
+
+def _with_etag(request: Request, data: dict[str, Any], etag: str) -> Response:
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return FastJSONResponse(data, headers={"ETag": etag, "Cache-Control": _API_CACHE_CONTROL})
+
+
+def _status_response(request: Request, data: dict[str, Any], etag: str) -> Response:
+    if not data["retry_after"]:
+        return _with_etag(request, data, etag)
+    # A throttled force refresh serves cached numbers; its own tag keeps the
+    # retry hint from being swallowed by a 304.
+    response = _with_etag(request, data, _etag(etag, data["retry_after"]))
+    response.headers["Retry-After"] = str(data["retry_after"])
+    return response
 
 
 def _is_truthy(value: str | None) -> bool:
@@ -106,7 +179,7 @@ async def _get_user_from_init(request: Request) -> dict[str, Any]:
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    return templates.TemplateResponse(
+    return _templates().TemplateResponse(
         "index.html",
         {
             "request": request,
@@ -118,7 +191,7 @@ async def index(request: Request):
 
 @app.get("/settings", response_class=HTMLResponse)
 async def settings_page(request: Request):
-    return templates.TemplateResponse(
+    return _templates().TemplateResponse(
         "settings.html",
         {
             "request": request,
@@ -130,7 +203,7 @@ async def settings_page(request: Request):
 
 @app.get("/status", response_class=HTMLResponse)
 async def status_page(request: Request):
-    return templates.TemplateResponse(
+    return _templates().TemplateResponse(
         "status.html",
         {
             "request": request,
@@ -140,13 +213,78 @@ async def status_page(request: Request):
     )
 
 
+@app.get("/assets/{name}")
+async def built_asset(request: Request, name: str):
+    asset = assets.get(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    headers = {"Cache-Control": assets.IMMUTABLE, "ETag": asset.etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("If-None-Match") == asset.etag:
+        return Response(status_code=304, headers=headers)
+    body, encoding = asset.encoded(request.headers.get("Accept-Encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=asset.media_type, headers=headers)
+
+
 @app.get("/favicon.ico")
 async def favicon():
     return FileResponse(base_dir / "static" / "favicon.ico", media_type="image/x-icon")
 
 
-@app.get("/api/status")
-async def api_status(request: Request):
+@app.post(settings.webhook_path)
+async def telegram_webhook(request: Request):
+    if settings.bot_mode != "webhook" or _bot is None or _dispatcher is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not settings.webhook_secret or not hmac.compare_digest(secret, settings.webhook_secret):
+        log.warning("Telegram webhook rejected: invalid secret token")
+        raise HTTPException(status_code=401, detail="Invalid secret token")
+    update = await request.json()
+    result = await _dispatcher.feed_webhook_update(_bot, update)
+    if result is not None:
+        await _dispatcher.silent_call_request(_bot, result)
+    return FastJSONResponse({"ok": True})
+
+
+@app.post("/hooks/github")
+async def github_hook(request: Request):
+    """Operator hook: counts pushes for every opted-in user with the pusher's login."""
+    if not settings.github_webhook_secret:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await _github_delivery(request, settings.github_webhook_secret)
+
+
+@app.post("/hooks/github/{telegram_id}")
+async def github_user_hook(request: Request, telegram_id: int):
+    """A user's own hook, signed with their secret; counts pushes for them only."""
+    secret = await repo.get_github_hook_secret(telegram_id)
+    if not secret:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await _github_delivery(request, secret, telegram_id)
+
+
+async def _github_delivery(request: Request, secret: str, telegram_id: int | None = None) -> Response:
+    body = await request.body()
+    signature = request.headers.get("X-Hub-Signature-256")
+    if not webhooks.verify_github_signature(body, signature, secret):
+        log.warning("GitHub webhook rejected: invalid signature")
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    event = request.headers.get("X-GitHub-Event", "")
+    if event != "push":
+        return FastJSONResponse({"ok": True, "ignored": event})
+    delivery_id = request.headers.get("X-GitHub-Delivery", "")
+    if not delivery_id:
+        raise HTTPException(status_code=400, detail="Missing delivery id")
+    try:
+        payload = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid payload") from exc
+    users = await webhooks.handle_github_push(delivery_id, payload, telegram_id)
+    return FastJSONResponse({"ok": True, "users": users})
+
+
+async def _load_db_user(request: Request) -> tuple[int, repo.UserRecord]:
     user = await _get_user_from_init(request)
     telegram_id = int(user["id"])
     db_user = await repo.get_user(telegram_id)
@@ -158,131 +296,230 @@ async def api_status(request: Request):
             user.get("first_name"),
             user.get("last_name"),
         )
+    return telegram_id, db_user
 
-    force = _is_truthy(request.query_params.get("force"))
-    tz_name = db_user["tz"]
-    goals = json.loads(db_user["goals_json"])
-    repos = json.loads(db_user["repos_json"])
-    gh_user = _normalize_handle(db_user.get("github_username"))
-    lc_user = _normalize_handle(db_user.get("leetcode_username"))
-
-    if not gh_user or not lc_user:
-        return JSONResponse(
-            {
-                "needs_setup": True,
-                "github_username": gh_user,
-                "leetcode_username": lc_user,
-                "timezone": tz_name,
-                "avatar": db_user.get("avatar"),
-            }
-        )
 
-    today = now_in_tz(tz_name).date()
-    today_str = today.isoformat()
-    gh_key = (telegram_id, today_str, "github_commits")
-    lc_key = (telegram_id, today_str, "leetcode_solved")
-
-    github_commits = None
-    leetcode_solved = None
-    if not force:
-        if gh_user:
-            github_commits = _cache_get(gh_key)
-        if lc_user:
-            leetcode_solved = _cache_get(lc_key)
-
-    tasks: list[tuple[str, Any]] = []
-    if gh_user and github_commits is None:
-        tasks.append(("github", github.count_commits_today(gh_user, tz_name, repos)))
-    if lc_user and leetcode_solved is None:
-        tasks.append(("leetcode", leetcode.count_accepted_today(lc_user, tz_name)))
-
-    if tasks:
-        results = await asyncio.gather(*(task for _, task in tasks))
-        for (key, _), value in zip(tasks, results):
-            if key == "github":
-                github_commits = int(value)
-                _cache_set(gh_key, github_commits)
-            elif key == "leetcode":
-                leetcode_solved = int(value)
-                _cache_set(lc_key, leetcode_solved)
-
-    if github_commits is None:
-        github_commits = 0
-    if leetcode_solved is None:
-        leetcode_solved = 0
-    await repo.upsert_daily_stats(
-        telegram_id,
-        today_str,
+def _needs_setup(db_user: repo.UserRecord) -> dict[str, Any] | None:
+    gh_user = _normalize_handle(db_user.github_username)
+    lc_user = _normalize_handle(db_user.leetcode_username)
+    if gh_user and lc_user:
+        return None
+    return {
+        "needs_setup": True,
+        "github_username": gh_user,
+        "leetcode_username": lc_user,
+        "timezone": db_user.tz,
+        "avatar": db_user.avatar,
+    }
+
+
+def _status_etag(
+    db_user: repo.UserRecord,
+    day: str,
+    github_commits: int,
+    leetcode_solved: int,
+    streak: dict[str, Any],
+    stale: list[str],
+) -> str:
+    gh_user = _normalize_handle(db_user.github_username)
+    lc_user = _normalize_handle(db_user.leetcode_username)
+    return _etag(
+        day,
+        [db_user.tz, db_user.goals, db_user.reminders, db_user.repos, db_user.avatar],
+        [gh_user, lc_user, bool(db_user.github_webhook)],
         github_commits,
         leetcode_solved,
-    )
-    streak_info = await streaks.update_streak_for_date(
-        telegram_id,
-        today,
-        goals,
-        {"github_commits": github_commits, "leetcode_solved": leetcode_solved},
+        [int(streak["current_streak"]), int(streak["best_streak"]), streak["last_success_date"]],
+        stale,
+        upstream.bad_handles(gh_user, lc_user),
     )
 
-    return JSONResponse(
-        {
-            "needs_setup": False,
-            "date": today.isoformat(),
-            "timezone": tz_name,
-            "github_commits": github_commits,
-            "leetcode_solved": leetcode_solved,
-            "goals": goals,
-            "reminders": json.loads(db_user["reminders_json"]),
-            "repos": repos,
-            "streak": streak_info,
-            "avatar": db_user.get("avatar"),
-            "github_username": gh_user,
-            "leetcode_username": lc_user,
-        }
-    )
 
+@app.get("/api/status")
+async def api_status(request: Request):
+    deadline = request_deadline()
+    telegram_id, db_user = await _load_db_user(request)
+    setup = _needs_setup(db_user)
+    if setup:
+        return FastJSONResponse(setup)
+    force = _is_truthy(request.query_params.get("force"))
+    today = now_in_tz(db_user.tz).date()
+    today_str = today.isoformat()
 
-@app.get("/api/history")
-async def api_history(request: Request, days: int = 7, init_data: str | None = Query(None, alias="initData")):
-    user = await _get_user_from_init(request)
-    telegram_id = int(user["id"])
-    db_user = await repo.get_user(telegram_id)
-    if not db_user:
-        db_user = await repo.create_user_if_missing(
-            telegram_id,
-            settings.timezone_default,
-            user.get("username"),
-            user.get("first_name"),
-            user.get("last_name"),
-        )
+    stored = None
+    if not force and request.headers.get("If-None-Match"):
+        streak_row, rows = await repo.get_streak_and_history(telegram_id, today_str, today_str)
+        stored = (rows[0] if rows else None, streak_row)
+        counts = status_service.settled_counts(db_user, today_str, stored[0])
+        if counts and streak_row:
+            etag = _status_etag(db_user, today_str, *counts, streak_row, [])
+            if _etag_matches(request, etag):
+                return _not_modified(etag)
+
+    data = await status_service.get(db_user, today=today, force=force, deadline=deadline, stored=stored)
+    etag = _status_etag(
+        db_user, today_str, data["github_commits"], data["leetcode_solved"], data["streak"], data["stale"]
+    )
+    return _status_response(request, data, etag)
 
-    tz_name = db_user["tz"]
-    gh_user = _normalize_handle(db_user.get("github_username"))
-    lc_user = _normalize_handle(db_user.get("leetcode_username"))
-    if not gh_user or not lc_user:
-        return JSONResponse({"needs_setup": True, "timezone": tz_name})
-    safe_days = max(1, min(int(days or 7), 31))
-    today = now_in_tz(tz_name).date()
+
+@app.get("/api/dashboard")
+async def api_dashboard(request: Request, days: int = 7):
+    """Status, settings and history for one WebApp open in a single request."""
+    deadline = request_deadline()
+    telegram_id, db_user = await _load_db_user(request)
+    setup = _needs_setup(db_user)
+    if setup:
+        return FastJSONResponse(setup)
+    force = _is_truthy(request.query_params.get("force"))
+    today = now_in_tz(db_user.tz).date()
+    today_str = today.isoformat()
+    safe_days = _history_window(days)
     start_date = today - timedelta(days=safe_days - 1)
 
-    rows = await repo.get_daily_stats_range(
-        telegram_id,
-        start_date.isoformat(),
-        today.isoformat(),
+    streak_row, rows = await repo.get_streak_and_history(telegram_id, start_date.isoformat(), today_str)
+    today_row = next((row for row in rows if row["date"] == today_str), None)
+    # History was read before today's numbers are refreshed; today's entry
+    # always shows the numbers being served.
+    rows = [row for row in rows if row["date"] != today_str]
+
+    week = leaderboard.period_for("week", today)
+    if not force and streak_row and request.headers.get("If-None-Match"):
+        counts = status_service.settled_counts(db_user, today_str, today_row)
+        if counts:
+            history = _history_days(
+                rows + [{"date": today_str, "github_commits": counts[0], "leetcode_solved": counts[1]}],
+                start_date,
+                safe_days,
+            )
+            rank = await leaderboard.standing("week", week, telegram_id)
+            etag = _etag(_status_etag(db_user, today_str, *counts, streak_row, []), history, rank)
+            if _etag_matches(request, etag):
+                return _not_modified(etag)
+
+    data = await status_service.get(
+        db_user, today=today, force=force, deadline=deadline, stored=(today_row, streak_row)
+    )
+    rows.append(
+        {"date": today_str, "github_commits": data["github_commits"], "leetcode_solved": data["leetcode_solved"]}
+    )
+    history = _history_days(rows, start_date, safe_days)
+    data["history"] = {"tz": db_user.tz, "days": history}
+    # Read after status_service.get so today's write is already ranked.
+    data["rank"] = await leaderboard.standing("week", week, telegram_id)
+    etag = _etag(
+        _status_etag(db_user, today_str, data["github_commits"], data["leetcode_solved"], data["streak"], data["stale"]),
+        history,
+        data["rank"],
     )
+    return _status_response(request, data, etag)
+
+
+def _history_window(days: int | None) -> int:
+    return max(1, min(int(days or 7), 31))
+
+
+def _history_days(rows: list[dict[str, Any]], start_date: date, days: int) -> list[dict[str, Any]]:
     row_map = {row["date"]: row for row in rows}
     days_out = []
-    for i in range(safe_days):
-        date = (start_date + timedelta(days=i)).isoformat()
-        row = row_map.get(date)
+    for i in range(days):
+        day = (start_date + timedelta(days=i)).isoformat()
+        row = row_map.get(day)
         days_out.append(
             {
-                "date": date,
+                "date": day,
                 "github": int(row["github_commits"]) if row else 0,
                 "leetcode": int(row["leetcode_solved"]) if row else 0,
             }
         )
+    return days_out
+
+
+@app.get("/api/history")
+async def api_history(request: Request, days: int = 7, init_data: str | None = Query(None, alias="initData")):
+    telegram_id, db_user = await _load_db_user(request)
+    tz_name = db_user.tz
+    if _needs_setup(db_user):
+        return FastJSONResponse({"needs_setup": True, "timezone": tz_name})
+    safe_days = _history_window(days)
+    today = now_in_tz(tz_name).date()
+    start_date = today - timedelta(days=safe_days - 1)
 
-    return JSONResponse({"tz": tz_name, "days": days_out})
+    rows = await repo.get_daily_stats_range(
+        telegram_id,
+        start_date.isoformat(),
+        today.isoformat(),
+    )
+    etag = _etag(
+        tz_name,
+        start_date.isoformat(),
+        safe_days,
+        [(row["date"], row["github_commits"], row["leetcode_solved"]) for row in rows],
+    )
+    return _with_etag(request, {"tz": tz_name, "days": _history_days(rows, start_date, safe_days)}, etag)
+
+
+@app.get("/api/leaderboard")
+async def api_leaderboard(request: Request, board: str = "week", offset: int = 0, limit: int = 20):
+    """One page of a board plus the caller's own standing.
+
+    Entries carry only rank, score and avatar: other users' GitHub and
+    LeetCode handles are never exposed.
+    """
+    telegram_id, db_user = await _load_db_user(request)
+    if board not in leaderboard.BOARDS:
+        raise HTTPException(status_code=400, detail="Unknown board")
+    offset = max(offset, 0)
+    limit = max(1, min(limit, 100))
+    period = leaderboard.period_for(board, now_in_tz(db_user.tz).date())
+    ranking = await leaderboard.get_board(board, period)
+    page = ranking.page(offset, limit)
+    users = await asyncio.gather(*(repo.get_user(entry_id) for _, entry_id, _ in page))
+    entries = [
+        {
+            "rank": rank,
+            "score": score,
+            "avatar": (user.avatar or repo.DEFAULT_AVATAR) if user else repo.DEFAULT_AVATAR,
+            "me": entry_id == telegram_id,
+        }
+        for (rank, entry_id, score), user in zip(page, users)
+    ]
+    data = {
+        "board": board,
+        "period": period,
+        "total": len(ranking),
+        "offset": offset,
+        "limit": limit,
+        "entries": entries,
+        "me": {"rank": ranking.rank(telegram_id), "score": ranking.score(telegram_id)},
+    }
+    return _with_etag(request, data, _etag(data))
+
+
+@app.get("/api/events")
+async def api_events(request: Request):
+    """Server-sent stream of the user's daily stats and streak updates."""
+    telegram_id, _ = await _load_db_user(request)
+
+    async def stream():
+        queue = events.subscribe(telegram_id)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: stats\ndata: {jsoncodec.dumps(event).decode()}\n\n"
+        finally:
+            events.unsubscribe(telegram_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/health")
@@ -292,7 +529,7 @@ async def api_health():
         await repo.fetchone("SELECT 1")
     except Exception:
         db_ok = False
-    return JSONResponse(
+    return FastJSONResponse(
         {
             "ok": db_ok,
             "db": db_ok,
@@ -301,6 +538,19 @@ async def api_health():
     )
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/debug/traces")
+async def debug_traces(request: Request, limit: int = 20):
+    token = request.headers.get("X-Debug-Token", "")
+    if not settings.debug_token or not hmac.compare_digest(token, settings.debug_token):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return FastJSONResponse({"traces": tracing.recent_slow_traces(max(1, min(limit, 200)))})
+
+
 @app.get("/healthz")
 async def healthz():
     db_ok = True
@@ -308,7 +558,7 @@ async def healthz():
         await repo.fetchone("SELECT 1")
     except Exception:
         db_ok = False
-    return JSONResponse(
+    return FastJSONResponse(
         {
             "ok": db_ok,
             "db": db_ok,
@@ -317,6 +567,24 @@ async def healthz():
     )
 
 
+@app.post("/api/github-hook")
+async def api_github_hook(request: Request):
+    """URL and secret for the caller's own GitHub push webhook.
+
+    The secret is created on first call; {"rotate": true} replaces it.
+    """
+    telegram_id, _ = await _load_db_user(request)
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = {}
+    rotate = isinstance(payload, dict) and bool(payload.get("rotate"))
+    secret = await repo.create_github_hook_secret(telegram_id, rotate=rotate)
+    base_url = (settings.base_url or str(request.base_url)).rstrip("/")
+    url = f"{base_url}/hooks/github/{telegram_id}"
+    return FastJSONResponse({"url": url, "secret": secret})
+
+
 @app.post("/api/settings")
 async def api_settings(request: Request):
     user = await _get_user_from_init(request)
@@ -355,10 +623,13 @@ async def api_settings(request: Request):
         updates["leetcode_username"] = _normalize_handle(payload.get("leetcode_username"))
     if "avatar" in payload:
         updates["avatar"] = payload["avatar"]
+    if "github_webhook" in payload:
+        updates["github_webhook"] = 1 if payload["github_webhook"] else 0
 
     if updates:
         await repo.update_user_fields(telegram_id, **updates)
-        if reminders_changed and scheduler_instance:
-            await scheduler_instance.schedule_for_user(telegram_id)
+        scheduler = get_scheduler_instance()
+        if reminders_changed and scheduler:
+            await scheduler.schedule_for_user(telegram_id)
 
-    return JSONResponse({"ok": True})
+    return FastJSONResponse({"ok": True})
@@ -12,6 +12,8 @@ const state = {
   celebrated: { github_commits: false, leetcode_solved: false },
   historyByDate: {},
   historyTz: "Europe/Kyiv",
+  statusDate: "",
+  events: null,
 };
 
 const pageType = document.body ? document.body.dataset.page || "" : "";
@@ -181,9 +183,16 @@ function maybeCelebrate(metricKey, current, goal, ringEl) {
 }
 
 function fillStatus(data) {
+  state.statusDate = data.date;
   document.getElementById("date").textContent = `${data.date} (${data.timezone})`;
   document.getElementById("github").textContent = data.github_commits;
   document.getElementById("leetcode").textContent = data.leetcode_solved;
+  const stale = data.stale || [];
+  ["github", "leetcode"].forEach((key) => {
+    const el = document.getElementById(key);
+    el.classList.toggle("stale", stale.includes(key));
+    el.title = stale.includes(key) ? "Last known value, refreshing in the background" : "";
+  });
   document.getElementById("github-goal").textContent = `/${data.goals.github_commits}`;
   document.getElementById("leetcode-goal").textContent = `/${data.goals.leetcode_solved}`;
   document.getElementById("current-streak").textContent = data.streak.current_streak;
@@ -208,6 +217,40 @@ function fillStatus(data) {
   maybeCelebrate("leetcode_solved", data.leetcode_solved, data.goals.leetcode_solved, leetcodeRing);
 }
 
+function applyLiveUpdate(update) {
+  if (!update || update.date !== state.statusDate) return;
+  const githubRing = document.querySelector("[data-ring='github']");
+  const leetcodeRing = document.querySelector("[data-ring='leetcode']");
+  if (update.github_commits !== undefined) {
+    document.getElementById("github").textContent = update.github_commits;
+    document.getElementById("github").classList.remove("stale");
+    setRing(githubRing, update.github_commits, state.goals.github_commits);
+    maybeCelebrate("github_commits", update.github_commits, state.goals.github_commits, githubRing);
+  }
+  if (update.leetcode_solved !== undefined) {
+    document.getElementById("leetcode").textContent = update.leetcode_solved;
+    document.getElementById("leetcode").classList.remove("stale");
+    setRing(leetcodeRing, update.leetcode_solved, state.goals.leetcode_solved);
+    maybeCelebrate("leetcode_solved", update.leetcode_solved, state.goals.leetcode_solved, leetcodeRing);
+  }
+  if (update.streak) {
+    document.getElementById("current-streak").textContent = update.streak.current_streak;
+    document.getElementById("best-streak").textContent = update.streak.best_streak;
+  }
+}
+
+function subscribeLiveUpdates() {
+  if (state.events || !state.initData || typeof EventSource === "undefined") return;
+  state.events = new EventSource(buildUrl("/api/events", { initData: state.initData }));
+  state.events.addEventListener("stats", (event) => {
+    try {
+      applyLiveUpdate(JSON.parse(event.data));
+    } catch (err) {
+      console.warn("Bad live update:", err);
+    }
+  });
+}
+
 function hexToRgb(hex) {
   const value = hex.replace("#", "");
   if (value.length !== 6) return null;
@@ -255,6 +298,17 @@ function heatLevel(value) {
   return 4;
 }
 
+function renderRank(rank) {
+  const rankEl = document.getElementById("week-rank");
+  if (!rankEl) return;
+  if (!rank || !rank.rank) {
+    rankEl.style.display = "none";
+    return;
+  }
+  rankEl.textContent = `You are #${rank.rank} of ${rank.total} this week`;
+  rankEl.style.display = "block";
+}
+
 function renderHeatmap(data) {
   const githubGrid = document.querySelector("[data-heatmap='github']");
   const leetcodeGrid = document.querySelector("[data-heatmap='leetcode']");
@@ -367,24 +421,6 @@ function closeInsight() {
   backdrop.classList.remove("is-visible");
 }
 
-async function loadHistory() {
-  if (!state.initData) {
-    setHeatmapMessage("Open inside Telegram to see this week.");
-    return;
-  }
-  try {
-    const data = await apiGet("/api/history", { days: 7 });
-    if (data.needs_setup) {
-      setHeatmapMessage("Add your GitHub + LeetCode handles to see history.");
-      return;
-    }
-    renderHeatmap(data);
-  } catch (err) {
-    console.error("Failed to load history:", err);
-    setHeatmapMessage("History unavailable right now.");
-  }
-}
-
 function setSegmentDefaults() {
   document.querySelectorAll(".seg-btn").forEach((btn) => {
     btn.addEventListener("click", async () => {
@@ -400,6 +436,14 @@ function setSegmentDefaults() {
   });
 }
 
+function unknownHandlesMessage(data) {
+  const unknown = data.unknown_handles || [];
+  const parts = [];
+  if (unknown.includes("github")) parts.push(`GitHub user "${data.github_username}" was not found.`);
+  if (unknown.includes("leetcode")) parts.push(`LeetCode user "${data.leetcode_username}" was not found.`);
+  return parts.join(" ");
+}
+
 async function loadStatus(force = false) {
   state.initData = tg ? tg.initData || "" : "";
   if (!state.initData) {
@@ -412,12 +456,18 @@ async function loadStatus(force = false) {
   }
   clearError();
   try {
-    const data = await apiGet("/api/status", { force: force ? 1 : undefined });
+    const data =
+      pageType === "dashboard"
+        ? await apiGet("/api/dashboard", { days: 7, force: force ? 1 : undefined })
+        : await apiGet("/api/status", { force: force ? 1 : undefined });
     if (data.needs_setup) {
       if (data.avatar) {
         state.avatar = data.avatar;
         renderAvatarBadge();
       }
+      if (pageType === "dashboard") {
+        setHeatmapMessage("Add your GitHub + LeetCode handles to see history.");
+      }
       if (pageType !== "settings") {
         window.location.href = "/settings";
         return;
@@ -425,11 +475,21 @@ async function loadStatus(force = false) {
       setSetupError("Add your GitHub + LeetCode handles to continue.");
       return;
     }
+    const handlesWarning = unknownHandlesMessage(data);
     if (pageType !== "settings") {
+      const retryNotice = data.retry_after
+        ? `Refreshed too often; showing saved numbers. Try again in ${data.retry_after}s.`
+        : "";
+      const notice = [handlesWarning, retryNotice].filter(Boolean).join(" ");
+      if (notice) showError(notice);
       fillStatus(data);
-      if (pageType === "dashboard") {
-        await loadHistory();
+      if (data.history) {
+        renderHeatmap(data.history);
       }
+      if (data.rank) {
+        renderRank(data.rank);
+      }
+      subscribeLiveUpdates();
     } else {
       const ghInput = document.getElementById("settings-github");
       const lcInput = document.getElementById("settings-leetcode");
@@ -439,10 +499,14 @@ async function loadStatus(force = false) {
       if (lcInput && data.leetcode_username !== undefined) lcInput.value = data.leetcode_username || "";
       if (ghGoalInput && data.goals) ghGoalInput.value = data.goals.github_commits;
       if (lcGoalInput && data.goals) lcGoalInput.value = data.goals.leetcode_solved;
+      if (handlesWarning) setSetupError(handlesWarning);
     }
   } catch (err) {
     console.error("Failed to load status:", err);
     showError("Failed to load status. Please try again.");
+    if (pageType === "dashboard") {
+      setHeatmapMessage("History unavailable right now.");
+    }
   }
 }
 
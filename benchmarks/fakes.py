@@ -0,0 +1,134 @@
+"""Local stand-ins for the GitHub REST and LeetCode GraphQL endpoints we call."""
+
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class FakeUpstreamConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    events_per_feed: int = 30
+    submissions_per_user: int = 20
+    seed: int = 1
+
+
+@dataclass
+class FakeUpstream:
+    config: FakeUpstreamConfig
+    calls: Counter = field(default_factory=Counter)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.config.seed)
+
+    async def _delay(self) -> None:
+        jitter = self._rng.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        await asyncio.sleep(max(self.config.latency_ms + jitter, 0.0) / 1000)
+
+    def _should_fail(self) -> bool:
+        return self._rng.random() < self.config.error_rate
+
+    def github_events(self, username: str) -> list[dict]:
+        now = datetime.now(timezone.utc)
+        events = []
+        for i in range(self.config.events_per_feed):
+            created = now - timedelta(minutes=37 * i)
+            if i % 3 == 0:
+                events.append(
+                    {
+                        "id": str(i),
+                        "type": "WatchEvent",
+                        "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        "repo": {"name": f"{username}/repo{i % 4}"},
+                        "payload": {},
+                    }
+                )
+                continue
+            payload: dict = {"before": f"b{i:039d}", "head": f"h{i:039d}"}
+            if i % 7 == 0:
+                # No commits/size: forces the compare fallback.
+                pass
+            elif i % 5 == 0:
+                payload["distinct_size"] = 2
+            else:
+                payload["commits"] = [{"sha": f"{i}{j}", "distinct": True} for j in range(1 + i % 3)]
+            events.append(
+                {
+                    "id": str(i),
+                    "type": "PushEvent",
+                    "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "repo": {"name": f"{username}/repo{i % 4}"},
+                    "payload": payload,
+                }
+            )
+        return events
+
+    def leetcode_submissions(self) -> list[dict]:
+        now = int(time.time())
+        return [
+            {"id": str(i), "title": f"Problem {i}", "timestamp": str(now - 2400 * i)}
+            for i in range(self.config.submissions_per_user)
+        ]
+
+
+def github_app(fake: FakeUpstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/users/{username}/events")
+    async def events(username: str):
+        fake.calls["github.events"] += 1
+        await fake._delay()
+        if fake._should_fail():
+            return JSONResponse({"message": "Server Error"}, status_code=502)
+        return JSONResponse(fake.github_events(username))
+
+    @app.get("/repos/{owner}/{repo}/compare/{spec}")
+    async def compare(owner: str, repo: str, spec: str):
+        fake.calls["github.compare"] += 1
+        await fake._delay()
+        if fake._should_fail():
+            return JSONResponse({"message": "Server Error"}, status_code=502)
+        return JSONResponse({"ahead_by": 1, "commits": [{"sha": spec[:7]}]})
+
+    return app
+
+
+def leetcode_app(fake: FakeUpstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/graphql")
+    async def graphql(request: Request):
+        fake.calls["leetcode.graphql"] += 1
+        await request.body()
+        await fake._delay()
+        if fake._should_fail():
+            return JSONResponse({"errors": [{"message": "upstream error"}]}, status_code=502)
+        return JSONResponse({"data": {"recentAcSubmissionList": fake.leetcode_submissions()}})
+
+    return app
+
+
+async def serve(app: FastAPI) -> tuple[uvicorn.Server, asyncio.Task, int]:
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", access_log=False, lifespan="off")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, port
+
+
+async def shutdown(server: uvicorn.Server, task: asyncio.Task) -> None:
+    server.should_exit = True
+    await task
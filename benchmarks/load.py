@@ -0,0 +1,295 @@
+"""End-to-end load benchmark against local GitHub/LeetCode stand-ins.
+
+Usage:
+    python -m benchmarks.load --users 50 --requests 500 --concurrency 20 --output bench.json
+
+Starts the fake upstreams from benchmarks.fakes, points the app at them through
+GITHUB_API_URL / LEETCODE_GRAPHQL_URL, seeds synthetic users in a throwaway
+SQLite file, then drives /api/status, /api/history, /api/dashboard and a
+reminder burst and prints a JSON report.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from benchmarks import fakes
+
+BENCH_BOT_TOKEN = "123456:bench-token"
+
+
+def sign_init_data(user: dict[str, Any], bot_token: str = BENCH_BOT_TOKEN) -> str:
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"bench-{user['id']}",
+        "user": json.dumps(user, separators=(",", ":")),
+    }
+    data_check_string = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode("utf-8"), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(fields)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _summarise(latencies: list[float], errors: int, elapsed: float) -> dict[str, Any]:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p95": round(_percentile(latencies, 95) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+
+def _db_query_count() -> int:
+    from app.core import metrics
+
+    return sum(count for count, _ in metrics.DB_QUERY_SECONDS.totals().values())
+
+
+async def _drive(
+    total: int,
+    concurrency: int,
+    make_call: Callable[[int], Awaitable[bool]],
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                ok = await make_call(i)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+class _FakeBot:
+    def __init__(self) -> None:
+        self.sent = 0
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.sent += 1
+
+
+async def _phase(
+    name: str,
+    fake: fakes.FakeUpstream,
+    run: Callable[[], Awaitable[tuple[list[float], int, float]]],
+) -> dict[str, Any]:
+    calls_before = dict(fake.calls)
+    queries_before = _db_query_count()
+    latencies, errors, elapsed = await run()
+    result = _summarise(latencies, errors, elapsed)
+    result["phase"] = name
+    result["upstream_calls"] = {
+        key: fake.calls[key] - calls_before.get(key, 0) for key in sorted(fake.calls)
+    }
+    result["db_queries"] = _db_query_count() - queries_before
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    fake = fakes.FakeUpstream(
+        fakes.FakeUpstreamConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            events_per_feed=args.events,
+            submissions_per_user=args.submissions,
+            seed=args.seed,
+        )
+    )
+    gh_server, gh_task, gh_port = await fakes.serve(fakes.github_app(fake))
+    lc_server, lc_task, lc_port = await fakes.serve(fakes.leetcode_app(fake))
+
+    workdir = tempfile.mkdtemp(prefix="codestreaker-bench-")
+    os.environ.update(
+        {
+            "BOT_TOKEN": BENCH_BOT_TOKEN,
+            "BASE_URL": "https://bench.invalid",
+            "SECRET_KEY": "bench",
+            "GITHUB_TOKEN": "",
+            "DATABASE_URL": args.database_url or "",
+            "DATABASE_PATH": str(Path(workdir) / "bench.db"),
+            "GITHUB_API_URL": f"http://127.0.0.1:{gh_port}",
+            "LEETCODE_GRAPHQL_URL": f"http://127.0.0.1:{lc_port}/graphql",
+        }
+    )
+
+    # Imported late so Settings picks up the environment above.
+    from app.db import repo
+    from app.services.scheduler import ReminderScheduler
+    from app.services.status import status_service
+    from app.web.server import app as web_app
+
+    await repo.init_db()
+    user_ids = [9_000_000 + i for i in range(args.users)]
+    for telegram_id in user_ids:
+        await repo.create_user_if_missing(telegram_id, "Europe/Kyiv")
+        await repo.update_user_handles(telegram_id, f"gh{telegram_id}", f"lc{telegram_id}")
+    init_data = {
+        telegram_id: sign_init_data({"id": telegram_id, "first_name": "Bench"}) for telegram_id in user_ids
+    }
+
+    app_server, app_task, app_port = await fakes.serve(web_app)
+    base_url = f"http://127.0.0.1:{app_port}"
+    rng = random.Random(args.seed)
+    phases = []
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+
+            async def status_call(i: int) -> bool:
+                telegram_id = user_ids[i % len(user_ids)]
+                params = {"initData": init_data[telegram_id]}
+                if rng.random() < args.force_ratio:
+                    params["force"] = "1"
+                resp = await client.get("/api/status", params=params)
+                return resp.status_code == 200
+
+            async def history_call(i: int) -> bool:
+                telegram_id = user_ids[i % len(user_ids)]
+                resp = await client.get(
+                    "/api/history",
+                    params={"initData": init_data[telegram_id], "days": args.history_days},
+                )
+                return resp.status_code == 200
+
+            async def dashboard_call(i: int) -> bool:
+                telegram_id = user_ids[i % len(user_ids)]
+                resp = await client.get(
+                    "/api/dashboard",
+                    params={"initData": init_data[telegram_id], "days": args.history_days},
+                )
+                return resp.status_code == 200
+
+            phases.append(
+                await _phase("api_status", fake, lambda: _drive(args.requests, args.concurrency, status_call))
+            )
+            phases.append(
+                await _phase("api_history", fake, lambda: _drive(args.requests, args.concurrency, history_call))
+            )
+            phases.append(
+                await _phase("api_dashboard", fake, lambda: _drive(args.requests, args.concurrency, dashboard_call))
+            )
+
+        # The API phases leave the status cache warm and may have met the
+        # goals; the burst should measure a cold fetch and a send per user.
+        unreachable = {"github_commits": 10**6, "leetcode_solved": 10**6}
+        for telegram_id in user_ids:
+            await repo.set_goals(telegram_id, unreachable)
+        status_service._cache.clear()
+        bot = _FakeBot()
+        scheduler = ReminderScheduler(bot)
+
+        async def reminder_burst() -> tuple[list[float], int, float]:
+            # Every user's 21:30 reminder firing at once.
+            async def one(i: int) -> bool:
+                await scheduler._run_reminder(user_ids[i])
+                return True
+
+            return await _drive(len(user_ids), len(user_ids), one)
+
+        burst = await _phase("reminder_burst", fake, reminder_burst)
+        burst["messages_sent"] = bot.sent
+        phases.append(burst)
+    finally:
+        await fakes.shutdown(app_server, app_task)
+        await fakes.shutdown(gh_server, gh_task)
+        await fakes.shutdown(lc_server, lc_task)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "benchmark": "load",
+        "config": {
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "events_per_feed": args.events,
+            "submissions_per_user": args.submissions,
+            "history_days": args.history_days,
+            "force_ratio": args.force_ratio,
+            "backend": "postgres" if args.database_url else "sqlite",
+            "seed": args.seed,
+        },
+        "phases": phases,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--events", type=int, default=30, help="events per GitHub feed")
+    parser.add_argument("--submissions", type=int, default=20, help="LeetCode submissions per user")
+    parser.add_argument("--history-days", type=int, default=7)
+    parser.add_argument("--force-ratio", type=float, default=0.0, help="share of status calls with force=1")
+    parser.add_argument("--database-url", default="", help="run against Postgres instead of a temp SQLite file")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Micro-benchmarks for the per-request parsing and aggregation hot paths.
+
+Usage:
+    python -m benchmarks.micro                   # run and compare with the baseline
+    python -m benchmarks.micro --update-baseline # record a new baseline
+
+Each case runs on the recorded fixtures in benchmarks/fixtures under a clock
+frozen at FROZEN_NOW, so results are repeatable. Reports ops/sec (best of
+--repeat runs) and the peak bytes allocated by a single call. A case whose
+ops/sec drops more than --threshold below the baseline is flagged and the
+process exits with status 1.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from benchmarks.load import sign_init_data, BENCH_BOT_TOKEN
+
+FIXTURES = Path(__file__).with_name("fixtures")
+DEFAULT_BASELINE = Path(__file__).with_name("micro_baseline.json")
+FROZEN_NOW = datetime(2026, 3, 10, 15, 0, 0, tzinfo=timezone.utc)
+TZ_NAME = "Europe/Kyiv"
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):  # type: ignore[override]
+        if tz is None:
+            return FROZEN_NOW.replace(tzinfo=None)
+        return FROZEN_NOW.astimezone(tz)
+
+
+@contextmanager
+def frozen_clock(*modules: Any) -> Iterator[None]:
+    originals = [(module, module.datetime) for module in modules]
+    for module in modules:
+        module.datetime = _FrozenDatetime
+    try:
+        yield
+    finally:
+        for module, original in originals:
+            module.datetime = original
+
+
+def _load(name: str) -> Any:
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def build_cases() -> dict[str, Callable[[], Any]]:
+    from app.services import github, leetcode
+    from app.services.timeutils import validate_init_data
+    from app.web.server import _history_days
+
+    events = _load("github_events_300.json")
+    submissions = _load("leetcode_submissions_100.json")
+    history = _load("daily_stats_365.json")
+    _, start_utc, end_utc = github._local_day_bounds(TZ_NAME)
+    init_data = sign_init_data({"id": 9000001, "first_name": "Bench", "username": "bench"})
+    history_start = date.fromisoformat(history[0]["date"])
+
+    def count_commits_events() -> Any:
+        return github.tally_push_events(events, start_utc, end_utc, [])
+
+    def leetcode_is_today() -> Any:
+        return sum(1 for sub in submissions if leetcode._is_today(sub.get("timestamp", "0"), TZ_NAME))
+
+    def validate_init() -> Any:
+        return validate_init_data(init_data, BENCH_BOT_TOKEN)
+
+    def history_days() -> Any:
+        return _history_days(history, history_start, 365)
+
+    return {
+        "github.tally_push_events[300]": count_commits_events,
+        "leetcode._is_today[100]": leetcode_is_today,
+        "timeutils.validate_init_data": validate_init,
+        "server._history_days[365]": history_days,
+    }
+
+
+def _ops_per_sec(fn: Callable[[], Any], min_time: float, repeat: int) -> float:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return loops / best
+
+
+def _peak_alloc_bytes(fn: Callable[[], Any]) -> int:
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(peak - base, 0)
+
+
+def run(min_time: float, repeat: int) -> dict[str, dict[str, float]]:
+    from app.services import github, leetcode
+
+    results: dict[str, dict[str, float]] = {}
+    with frozen_clock(github, leetcode):
+        for name, fn in build_cases().items():
+            results[name] = {
+                "ops_per_sec": round(_ops_per_sec(fn, min_time, repeat), 1),
+                "peak_alloc_bytes": _peak_alloc_bytes(fn),
+            }
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        ratio = current["ops_per_sec"] / previous["ops_per_sec"]
+        current["vs_baseline"] = round(ratio, 3)
+        if ratio < 1 - threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed ops/sec drop, 0.2 = 20%%")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run(args.min_time, args.repeat)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        regressions: list[str] = []
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+    else:
+        regressions = []
+
+    report = {
+        "benchmark": "micro",
+        "frozen_now": FROZEN_NOW.isoformat(),
+        "results": results,
+        "regressions": regressions,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
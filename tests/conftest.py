@@ -0,0 +1,53 @@
+"""Shared test setup: a throwaway SQLite database and a known webhook secret.
+
+Settings are read once at import, so the environment is set here, before
+any app module is imported.
+"""
+
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+_TMP = Path(tempfile.mkdtemp(prefix="codestreaker-tests-"))
+os.environ["DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = str(_TMP / "test.db")
+os.environ["GITHUB_WEBHOOK_SECRET"] = "test-webhook-secret"
+os.environ["BOT_TOKEN"] = "123:test"
+
+import pytest
+
+from app.db import repo
+from app.db.writer import close_writer
+from app.services.status import status_service
+
+FIXTURES = Path(__file__).parent / "fixtures"
+WEBHOOK_SECRET = os.environ["GITHUB_WEBHOOK_SECRET"]
+
+Runner = Callable[[Awaitable[Any]], Any]
+
+
+def fixture_bytes(name: str) -> bytes:
+    return (FIXTURES / name).read_bytes()
+
+
+def _run(coro: Awaitable[Any]) -> Any:
+    async def wrapped() -> Any:
+        try:
+            return await coro
+        finally:
+            await close_writer()
+
+    return asyncio.run(wrapped())
+
+
+@pytest.fixture
+def run() -> Runner:
+    """Run a coroutine against a freshly migrated, empty database."""
+    Path(os.environ["DATABASE_PATH"]).unlink(missing_ok=True)
+    repo._db_ready = False
+    repo._USER_CACHE.clear()
+    status_service._cache.clear()
+    _run(repo.init_db())
+    return _run
@@ -0,0 +1,36 @@
+// leading comment
+const out = [];
+const a = 1
+const b = 2
+// ASI: next line starts with ( and must stay a separate statement
+;(function () { out.push("iife") })()
+let c = a
++ b  // not ASI: continues the expression
+out.push(c)
+let i = 0
+i
+++i
+out.push(i)
+const s1 = "has // not a comment";
+const s2 = 'single \' quote /* not comment */';
+const t = `line one
+// line two starts with slashes
+  indented ${a + `nested ${b} }`} and ${ { x: 1 }.x } end`;
+out.push(s1, s2, t)
+const re = /a\/b[/]c/g;
+out.push("xa/b/c".replace(re, "!"))
+function f() {
+  return /x+/.test("xx")
+}
+out.push(f())
+out.push(a - -b, a + +b, 10 / 2 / 5)
+out.push(1 .toFixed(1))
+const obj = { get value() { return 4 } }
+out.push(obj.value)
+out.push(typeof /re/)
+/* block
+   comment */
+out.push(a
+  ? "yes"
+  : "no")
+console.log(JSON.stringify(out))
@@ -0,0 +1,39 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from app.web import assets
+from tests.conftest import FIXTURES
+
+NODE = shutil.which("node")
+STATIC = Path(assets.__file__).parent / "static"
+
+
+def _node(path: Path) -> subprocess.CompletedProcess:
+    return subprocess.run([NODE, str(path)], capture_output=True, text=True, check=True)
+
+
+def test_minify_keeps_literals_verbatim():
+    source = (FIXTURES / "minify_cases.js").read_text()
+    minified = assets.minify_js(source)
+    assert "// line two starts with slashes\n  indented" in minified
+    assert '"has // not a comment"' in minified
+    assert "/a\\/b[/]c/g" in minified
+    assert "leading comment" not in minified and "block\n" not in minified
+
+
+@pytest.mark.skipif(NODE is None, reason="node is not installed")
+def test_minified_cases_behave_the_same(tmp_path):
+    source = FIXTURES / "minify_cases.js"
+    minified = tmp_path / "cases.min.js"
+    minified.write_text(assets.minify_js(source.read_text()))
+    assert _node(minified).stdout == _node(source).stdout
+
+
+@pytest.mark.skipif(NODE is None, reason="node is not installed")
+def test_minified_app_js_parses(tmp_path):
+    minified = tmp_path / "app.min.js"
+    minified.write_text(assets.minify_js((STATIC / "app.js").read_text()))
+    subprocess.run([NODE, "--check", str(minified)], check=True)
@@ -0,0 +1,97 @@
+import asyncio
+import dataclasses
+import os
+
+import pytest
+
+from app.db import repo
+from app.tools import data
+
+# More than _COPY_MIN_ROWS, so Postgres takes the COPY path.
+ROWS = 600
+
+
+def _users() -> list[tuple]:
+    columns, _ = repo.TABLES["users"]
+    return [
+        tuple(
+            {
+                "telegram_id": i,
+                "tz": "Europe/Kyiv" if i % 2 else "UTC",
+                "github_username": f"user{i}",
+                "github_webhook": i % 2,
+                "goals_json": '{"github": 1}',
+                "reminders_json": '["20:00"]',
+                "repos_json": "[]",
+                "created_at": "2026-10-01T00:00:00",
+            }.get(col)
+            for col in columns
+        )
+        for i in range(1, ROWS + 1)
+    ]
+
+
+def _days() -> list[tuple]:
+    return [(i, f"2026-10-{i % 19 + 1:02d}", i % 7, i % 3) for i in range(1, ROWS + 1)]
+
+
+async def _dump(table: str) -> list[dict]:
+    return [row async for row in repo.iter_rows(table)]
+
+
+@pytest.mark.parametrize("fmt", data.FORMATS)
+def test_export_import_round_trip(run, tmp_path, fmt):
+    async def seed():
+        await repo.upsert_rows("users", _users())
+        await repo.upsert_rows("daily_stats", _days())
+        await repo.upsert_rows("streaks", [(i, i % 5, i % 9, "2026-10-18") for i in range(1, ROWS + 1)])
+
+    async def dump_all():
+        return {table: await _dump(table) for table in repo.TABLES}
+
+    run(seed())
+    before = run(dump_all())
+    assert run(data.run(data.parse_args(["export", str(tmp_path), "--format", fmt]))) == 0
+
+    os.unlink(repo.settings.database_path)
+    repo._db_ready = False
+    repo._USER_CACHE.clear()
+    run(repo.init_db())
+    import_args = data.parse_args(["import", str(tmp_path), "--batch-size", "250"])
+    assert run(data.run(import_args)) == 0
+    # Importing twice changes nothing.
+    assert run(data.run(import_args)) == 0
+
+    after = run(dump_all())
+    assert after == before
+    assert len(after["daily_stats"]) == ROWS
+    assert run(repo.get_leaderboard_scores("all", ""))
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set")
+def test_postgres_copy_upsert(monkeypatch):
+    monkeypatch.setattr(repo, "settings", dataclasses.replace(repo.settings, database_url=os.environ["TEST_DATABASE_URL"]))
+    monkeypatch.setattr(repo, "_pg_pool", None)
+    monkeypatch.setattr(repo, "_db_ready", False)
+
+    async def scenario():
+        try:
+            await repo.init_db()
+            pool = await repo._ensure_pg_pool()
+            await pool.execute("TRUNCATE daily_stats, streaks, users CASCADE")
+            await repo.upsert_rows("users", _users())
+            days = _days()
+            # A repeated key inside one COPY batch: the last row wins.
+            await repo.upsert_rows("daily_stats", days + [(1, days[0][1], 99, 0)])
+            # A second load overwrites through ON CONFLICT.
+            await repo.upsert_rows("daily_stats", [(2, days[1][1], 50, 1)] * ROWS)
+            return await _dump("daily_stats")
+        finally:
+            if repo._pg_pool is not None:
+                await repo._pg_pool.close()
+
+    rows = asyncio.run(scenario())
+    assert len(rows) == ROWS
+    by_user = {row["telegram_id"]: row for row in rows}
+    assert (by_user[1]["github_commits"], by_user[2]["github_commits"]) == (99, 50)
+    assert by_user[3]["github_commits"] == 3
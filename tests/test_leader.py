@@ -0,0 +1,32 @@
+from app.db import repo
+from app.services.leader import LeaderElector
+
+
+def test_failed_activation_releases_lease_and_retries(run):
+    calls = []
+
+    async def on_elected():
+        calls.append("elected")
+        if len(calls) == 1:
+            raise RuntimeError("schedule_all_users failed")
+
+    async def on_demoted():
+        calls.append("demoted")
+
+    async def scenario():
+        elector = LeaderElector("scheduler", 30, on_elected=on_elected, on_demoted=on_demoted)
+        assert await repo.try_acquire_lease("scheduler", elector.holder, 30)
+        try:
+            await elector._set_leader(True)
+        except RuntimeError:
+            pass
+        failed = (elector.is_leader, await repo.try_acquire_lease("scheduler", "other-replica", 30))
+        await repo.release_lease("scheduler", "other-replica")
+        assert await repo.try_acquire_lease("scheduler", elector.holder, 30)
+        await elector._set_leader(True)
+        return failed, elector.is_leader
+
+    failed, retried = run(scenario())
+    assert failed == (False, True)
+    assert retried is True
+    assert calls == ["elected", "demoted", "elected"]
@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from app.db import repo
+from app.services.leaderboard import SortedBoard
+
+
+def test_sorted_board_ranks_ties_together():
+    board = SortedBoard([(1, 5), (2, 9), (3, 5)])
+    assert [board.rank(i) for i in (1, 2, 3)] == [2, 1, 2]
+    board.set(1, 10)
+    board.set(4, 0)
+    assert board.page(0, 10) == [(1, 1, 10), (2, 2, 9), (3, 3, 5), (4, 4, 0)]
+    assert board.page(1, 2) == [(2, 2, 9), (3, 3, 5)]
+    assert (len(board), board.score(1), board.rank(5)) == (4, 10, None)
+
+
+def test_api_leaderboard_hides_handles(run, monkeypatch):
+    from app.web import server
+
+    async def seed():
+        for telegram_id, login in ((1, "octo-cat"), (2, "hubot")):
+            await repo.create_user_if_missing(telegram_id, "UTC")
+            await repo.update_user_fields(telegram_id, github_username=login, leetcode_username=f"lc-{login}")
+            await repo.save_day(telegram_id, "2026-10-19", telegram_id, 0)
+
+    async def caller(request):
+        return {"id": 1}
+
+    run(seed())
+    monkeypatch.setattr(server, "_get_user_from_init", caller)
+    with TestClient(server.app) as client:
+        response = client.get("/api/leaderboard", params={"board": "all"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [(entry["rank"], entry["score"], entry["me"]) for entry in data["entries"]] == [(1, 2, False), (2, 1, True)]
+    assert all(set(entry) == {"rank", "score", "avatar", "me"} for entry in data["entries"])
+    assert "octo-cat" not in response.text and "hubot" not in response.text
@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import leetcode, upstream
+from app.services.breaker import leetcode_breaker
+
+
+@pytest.fixture
+def graphql(monkeypatch):
+    """Answer LeetCode GraphQL requests with the queued replies, in order."""
+    replies: list[dict] = []
+    client = httpx.AsyncClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=replies.pop(0))
+
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: client(transport=httpx.MockTransport(handler), **kw))
+    # Skip the retry back-off.
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(upstream, "_BAD_HANDLES", {})
+    leetcode_breaker.record_success()
+    return replies
+
+
+async def _no_sleep(seconds: float) -> None:
+    return None
+
+
+def test_unknown_user_is_cached_as_bad(graphql):
+    graphql.append(
+        {
+            "errors": [{"message": "That user does not exist.", "path": ["recentAcSubmissionList"]}],
+            "data": {"recentAcSubmissionList": None},
+        }
+    )
+    assert asyncio.run(leetcode._request_recent("ghost")) == []
+    assert upstream.is_bad_handle("leetcode", "ghost")
+
+
+def test_other_graphql_errors_are_retried_not_cached(graphql):
+    rate_limited = {"errors": [{"message": "Too many requests, please slow down"}], "data": {"recentAcSubmissionList": None}}
+    graphql.extend([rate_limited, {"data": None}, {"data": {"recentAcSubmissionList": [{"id": "1", "timestamp": "0"}]}}])
+    assert asyncio.run(leetcode._request_recent("busy")) == [{"id": "1", "timestamp": "0"}]
+    assert not upstream.is_bad_handle("leetcode", "busy")
+
+
+def test_persistent_graphql_errors_report_unreachable(graphql):
+    graphql.extend([{"errors": [{"message": "Internal error"}], "data": {"recentAcSubmissionList": None}}] * 3)
+    assert asyncio.run(leetcode._request_recent("busy")) is None
+    assert not upstream.is_bad_handle("leetcode", "busy")
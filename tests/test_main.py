@@ -0,0 +1,60 @@
+import asyncio
+import dataclasses
+import os
+import signal
+
+import uvicorn
+from aiogram import Bot, Dispatcher
+
+from app import main as app_main
+from app.db import repo
+from app.services import snapshot
+
+
+def test_sigterm_in_polling_mode_reaches_shutdown(run, monkeypatch):
+    """Both servers stop on one SIGTERM, and the snapshot is saved."""
+    test_settings = dataclasses.replace(
+        app_main.settings,
+        bot_token="123:test",
+        base_url="https://example.test",
+        secret_key="test-secret",
+        bot_mode="polling",
+        cache_snapshot=True,
+    )
+    monkeypatch.setattr(app_main, "settings", test_settings)
+    monkeypatch.setattr(app_main, "_web_server", None)
+    monkeypatch.setattr(app_main, "setup_logging", lambda: None)
+
+    async def no_telegram(*args, **kwargs):
+        return True
+
+    async def poll_forever(self, *args, **kwargs):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(Bot, "delete_webhook", no_telegram)
+    monkeypatch.setattr(Dispatcher, "_polling", poll_forever)
+    config = uvicorn.Config
+    monkeypatch.setattr(uvicorn, "Config", lambda *args, **kwargs: config(*args, **{**kwargs, "port": 0}))
+    saved = []
+    save = snapshot.save
+
+    async def recording_save():
+        saved.append(True)
+        await save()
+
+    monkeypatch.setattr(snapshot, "save", recording_save)
+
+    async def scenario():
+        task = asyncio.create_task(app_main.main())
+        while not (app_main._web_server and app_main._web_server.started):
+            assert not task.done(), task.exception()
+            await asyncio.sleep(0.05)
+        os.kill(os.getpid(), signal.SIGTERM)
+        done, _ = await asyncio.wait({task}, timeout=10)
+        if not done:
+            task.cancel()
+        return bool(done)
+
+    assert asyncio.run(scenario()), "main() did not return after SIGTERM"
+    assert saved == [True]
+    assert run(repo.load_cache_snapshots("", 8))
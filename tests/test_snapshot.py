@@ -0,0 +1,48 @@
+import time
+
+from app.db import repo
+from app.db.writer import get_writer
+from app.services import snapshot
+from app.services.status import status_service
+
+
+def _as_replica(monkeypatch, host: str) -> None:
+    monkeypatch.setattr(snapshot.socket, "gethostname", lambda: host)
+
+
+def test_replicas_keep_their_own_rows_and_restore_merges_them(run, monkeypatch):
+    now = time.time()
+    key_a = (1, "2026-10-19", "github_commits")
+    key_b = (2, "2026-10-19", "github_commits")
+
+    async def scenario():
+        _as_replica(monkeypatch, "replica-a")
+        status_service._cache.update({key_a: (3, now), key_b: (1, now)})
+        await snapshot.save()
+        # replica-b saves later and has a newer value for user 2.
+        _as_replica(monkeypatch, "replica-b")
+        status_service._cache.clear()
+        status_service._cache[key_b] = (5, now)
+        await snapshot.save()
+
+        status_service._cache.clear()
+        await snapshot.restore()
+        names = await repo.fetchall("SELECT name FROM cache_snapshots ORDER BY name")
+        return names, dict(status_service._cache)
+
+    names, cache = run(scenario())
+    assert [row["name"] for row in names] == ["caches:replica-a", "caches:replica-b"]
+    assert {key: value for key, (value, _) in cache.items()} == {key_a: 3, key_b: 5}
+
+
+def test_save_drops_rows_of_replicas_gone_for_a_day(run, monkeypatch):
+    async def scenario():
+        _as_replica(monkeypatch, "old-replica")
+        await snapshot.save()
+        await get_writer().execute("UPDATE cache_snapshots SET saved_at = '2026-01-01T00:00:00'")
+        assert await repo.load_cache_snapshots(snapshot._cutoff(), 8) == []
+        _as_replica(monkeypatch, "replica-a")
+        await snapshot.save()
+        return await repo.fetchall("SELECT name FROM cache_snapshots")
+
+    assert run(scenario()) == [{"name": "caches:replica-a"}]
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import date
+
+from app.db import repo
+from app.services import leetcode, status, webhooks
+from app.services.status import StatusService, status_service
+from tests.conftest import fixture_bytes
+
+STREAK = {"current_streak": 1, "best_streak": 1, "last_success_date": "2026-10-19"}
+
+
+def test_save_day_without_github_keeps_pushed_commits(run):
+    async def scenario():
+        await repo.create_user_if_missing(1, "UTC")
+        await repo.record_github_push("d1", [(1, "2026-10-19", 3)])
+        saved = await repo.save_day(1, "2026-10-19", None, 2, STREAK)
+        return saved, await repo.get_daily_stats(1, "2026-10-19")
+
+    saved, row = run(scenario())
+    assert saved == (3, 2)
+    assert (row["github_commits"], row["leetcode_solved"]) == (3, 2)
+
+
+def test_push_after_save_day_without_github_still_counts(run):
+    async def scenario():
+        await repo.create_user_if_missing(1, "UTC")
+        first = await repo.save_day(1, "2026-10-19", None, 1)
+        await repo.record_github_push("d1", [(1, "2026-10-19", 2)])
+        second = await repo.save_day(1, "2026-10-19", None, 1)
+        return first, second
+
+    assert run(scenario()) == ((0, 1), (2, 1))
+
+
+def test_save_day_with_github_overwrites(run):
+    async def scenario():
+        await repo.create_user_if_missing(1, "UTC")
+        await repo.save_day(1, "2026-10-19", 5, 1)
+        return await repo.save_day(1, "2026-10-19", 4, 2)
+
+    assert run(scenario()) == (4, 2)
+
+
+def test_push_during_leetcode_fetch_is_kept(run, monkeypatch):
+    # The recorded push lands on 2026-10-18 in UTC.
+    push = json.loads(fixture_bytes("github_push.json"))
+    fetching = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_count(username, tz_name):
+        fetching.set()
+        await release.wait()
+        return 2
+
+    monkeypatch.setattr(leetcode, "count_accepted_today", slow_count)
+
+    async def push_while_fetching():
+        await fetching.wait()
+        await webhooks.handle_github_push("d1", push)
+        release.set()
+
+    async def scenario():
+        await repo.create_user_if_missing(1, "UTC")
+        await repo.update_user_fields(1, github_username="Octo-Cat", leetcode_username="octo", github_webhook=1)
+        user = await repo.get_user(1)
+        status, _ = await asyncio.gather(
+            status_service.get(user, today=date(2026, 10, 18), force=True),
+            push_while_fetching(),
+        )
+        return status, await repo.get_daily_stats(1, "2026-10-18")
+
+    status, row = run(scenario())
+    assert (status["github_commits"], status["leetcode_solved"]) == (2, 2)
+    assert (row["github_commits"], row["leetcode_solved"]) == (2, 2)
+    # The goals (2 and 2) are only met with the push counted.
+    assert status["streak"]["current_streak"] == 1
+    assert run(repo.fetchone("SELECT current_streak FROM streaks WHERE telegram_id = 1"))["current_streak"] == 1
+
+
+def test_force_buckets_evict_least_recently_used(monkeypatch):
+    monkeypatch.setattr(status, "_FORCE_BUCKETS_MAX", 3)
+    service = StatusService(force_per_user=1, force_global=0)
+    assert [service.force_wait(i) for i in (1, 2, 3)] == [0, 0, 0]
+    assert service.force_wait(1) > 0  # Still limited; 1 is now the most recent.
+    assert service.force_wait(4) == 0
+    assert list(service._force_users) == [3, 1, 4]
+    assert service.force_wait(1) > 0
+
+
+def test_unchanged_save_skips_score_refresh(run, monkeypatch):
+    refreshed = []
+    refresh = repo._refresh_daily_scores
+
+    async def counting_refresh(conn, keys):
+        refreshed.append(list(keys))
+        return await refresh(conn, keys)
+
+    monkeypatch.setattr(repo, "_refresh_daily_scores", counting_refresh)
+
+    async def scenario():
+        await repo.create_user_if_missing(1, "UTC")
+        saves = [
+            await repo.save_day(1, "2026-10-19", 2, 1),
+            await repo.save_day(1, "2026-10-19", 2, 1),
+            await repo.save_day(1, "2026-10-19", None, 1, STREAK),
+            await repo.save_day(1, "2026-10-19", 3, 1),
+        ]
+        return saves, await repo.get_leaderboard_scores("all", "")
+
+    saves, scores = run(scenario())
+    assert saves == [(2, 1), (2, 1), (2, 1), (3, 1)]
+    assert len(refreshed) == 2
+    assert scores == [(1, 4)]
@@ -0,0 +1,127 @@
+import hashlib
+import hmac
+import json
+
+from fastapi.testclient import TestClient
+
+from app.db import repo
+from app.services import webhooks
+from tests.conftest import WEBHOOK_SECRET, fixture_bytes
+
+PUSH_BODY = fixture_bytes("github_push.json")
+PUSH_HEADERS = json.loads(fixture_bytes("github_push.headers.json"))
+PUSH = json.loads(PUSH_BODY)
+DELETE_PUSH = json.loads(fixture_bytes("github_push_delete.json"))
+
+
+async def _user(telegram_id: int, tz: str, login: str, webhook: bool = True, repos: list[str] | None = None) -> None:
+    await repo.create_user_if_missing(telegram_id, tz)
+    await repo.update_user_fields(telegram_id, github_username=login, github_webhook=int(webhook))
+    if repos is not None:
+        await repo.set_repos(telegram_id, repos)
+
+
+def test_verify_signature_accepts_recorded_delivery():
+    signature = PUSH_HEADERS["X-Hub-Signature-256"]
+    assert webhooks.verify_github_signature(PUSH_BODY, signature, WEBHOOK_SECRET)
+
+
+def test_verify_signature_rejects_tampering():
+    signature = PUSH_HEADERS["X-Hub-Signature-256"]
+    assert not webhooks.verify_github_signature(PUSH_BODY.replace(b"Octo-Cat", b"Mallory"), signature, WEBHOOK_SECRET)
+    assert not webhooks.verify_github_signature(PUSH_BODY, signature, "other-secret")
+    assert not webhooks.verify_github_signature(PUSH_BODY, signature.removeprefix("sha256="), WEBHOOK_SECRET)
+    assert not webhooks.verify_github_signature(PUSH_BODY, None, WEBHOOK_SECRET)
+
+
+def test_commit_count_skips_non_distinct_commits():
+    # The merge commit was already pushed to another branch.
+    assert webhooks.push_commit_count(PUSH) == 2
+
+
+def test_commit_count_of_branch_deletion_is_zero():
+    assert webhooks.push_commit_count(DELETE_PUSH) == 0
+
+
+def test_login_comes_from_sender_not_pusher():
+    payload = dict(PUSH, pusher={"name": "Octo Cat (display name)"})
+    assert webhooks.push_login(payload) == "Octo-Cat"
+    assert webhooks.push_login(dict(PUSH, sender={})) == "Octo-Cat"
+
+
+def test_push_counts_on_pushed_at_date_in_each_users_timezone(run):
+    # pushed_at is 2026-10-18 22:30 UTC: already the 19th in Kyiv.
+    async def scenario():
+        await _user(1, "Europe/Kyiv", "octo-cat")
+        await _user(2, "UTC", "Octo-Cat")
+        await _user(3, "UTC", "Octo-Cat", webhook=False)
+        await _user(4, "UTC", "someone-else")
+        await _user(5, "UTC", "Octo-Cat", repos=["Octo-Cat/other"])
+        users = await webhooks.handle_github_push(PUSH_HEADERS["X-GitHub-Delivery"], PUSH)
+        return users, await repo.fetchall("SELECT telegram_id, date, github_commits FROM daily_stats ORDER BY telegram_id")
+
+    users, rows = run(scenario())
+    assert users == 2
+    assert rows == [
+        {"telegram_id": 1, "date": "2026-10-19", "github_commits": 2},
+        {"telegram_id": 2, "date": "2026-10-18", "github_commits": 2},
+    ]
+
+
+def test_redelivery_is_counted_once(run):
+    async def scenario():
+        await _user(1, "UTC", "Octo-Cat")
+        first = await webhooks.handle_github_push("delivery-1", PUSH)
+        again = await webhooks.handle_github_push("delivery-1", PUSH)
+        return first, again, await repo.get_daily_stats(1, "2026-10-18")
+
+    first, again, row = run(scenario())
+    assert (first, again) == (1, 0)
+    assert row["github_commits"] == 2
+
+
+def test_endpoint_replays_recorded_delivery(run):
+    from app.web.server import app
+
+    run(_user(1, "UTC", "Octo-Cat"))
+    with TestClient(app) as client:
+        ok = client.post("/hooks/github", content=PUSH_BODY, headers=PUSH_HEADERS)
+        forged = client.post(
+            "/hooks/github",
+            content=PUSH_BODY.replace(b'"distinct": false', b'"distinct": true'),
+            headers=PUSH_HEADERS,
+        )
+    assert ok.status_code == 200 and ok.json() == {"ok": True, "users": 1}
+    assert forged.status_code == 401
+    assert run(repo.get_daily_stats(1, "2026-10-18"))["github_commits"] == 2
+
+
+def _signed(body: bytes, secret: str) -> dict[str, str]:
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return {**PUSH_HEADERS, "X-Hub-Signature-256": signature}
+
+
+def test_user_hook_counts_only_its_owner(run, monkeypatch):
+    from app.web import server
+
+    async def caller(request):
+        return {"id": 1}
+
+    run(_user(1, "UTC", "Octo-Cat"))
+    run(_user(2, "UTC", "Octo-Cat"))
+    monkeypatch.setattr(server, "_get_user_from_init", caller)
+    with TestClient(server.app) as client:
+        hook = client.post("/api/github-hook").json()
+        assert client.post("/api/github-hook").json() == hook
+        assert hook["url"].endswith("/hooks/github/1")
+        path = "/hooks/github/1"
+        # The operator secret and another user's hook don't accept it.
+        assert client.post(path, content=PUSH_BODY, headers=PUSH_HEADERS).status_code == 401
+        assert client.post("/hooks/github/2", content=PUSH_BODY, headers=_signed(PUSH_BODY, hook["secret"])).status_code == 404
+        ok = client.post(path, content=PUSH_BODY, headers=_signed(PUSH_BODY, hook["secret"]))
+        rotated = client.post("/api/github-hook", json={"rotate": True}).json()
+        stale = client.post(path, content=PUSH_BODY, headers=_signed(PUSH_BODY, hook["secret"]))
+    assert ok.status_code == 200 and ok.json() == {"ok": True, "users": 1}
+    assert rotated["secret"] != hook["secret"] and stale.status_code == 401
+    assert run(repo.get_daily_stats(1, "2026-10-18"))["github_commits"] == 2
+    assert run(repo.get_daily_stats(2, "2026-10-18")) is None